@@ -1,9 +1,20 @@
 from django.contrib import admin
 
-from .models import Category, Post, Location, Comment
+from .images import replace_image, start_image_change
+from .models import Category, Post, Location, Comment, ImageJob
+
+
+@admin.register(Post)
+class PostAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        # Same path as the post forms on the site, see PostMixin.
+        old_files = start_image_change(form)
+        super().save_model(request, obj, form, change)
+        if old_files is not None:
+            replace_image(obj, old_files)
 
 
 admin.site.register(Category)
-admin.site.register(Post)
 admin.site.register(Location)
 admin.site.register(Comment)
+admin.site.register(ImageJob)
@@ -0,0 +1,230 @@
+from functools import partial, wraps
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+
+from . import constants
+from .compression import compress_page
+from .purge import purge_keys
+
+GENERATION_TAG = 'generation'
+
+
+def feed_count_key(feed):
+    return f'blog:feed_count:{feed}'
+
+
+def index_count_key():
+    return feed_count_key('index')
+
+
+def category_count_key(category_id):
+    return feed_count_key(f'category:{category_id}')
+
+
+def author_count_key(author_id, own=False):
+    return feed_count_key(f'author:{author_id}{":own" if own else ""}')
+
+
+def invalidate_feed_counts(category_ids=(), author_ids=()):
+    keys = [index_count_key()]
+    keys += [
+        category_count_key(category_id)
+        for category_id in category_ids if category_id is not None
+    ]
+    for author_id in author_ids:
+        keys += [
+            author_count_key(author_id),
+            author_count_key(author_id, own=True)
+        ]
+    cache.delete_many(keys)
+
+
+def tag_key(tag):
+    return f'blog:tag:{tag}'
+
+
+def page_key(request):
+    path = md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:page:{path}'
+
+
+def post_tags(post):
+    tags = [f'post:{post.pk}']
+    if post.category is not None:
+        tags.append(f'category:{post.category.slug}')
+    if post.location_id is not None:
+        tags.append(f'location:{post.location_id}')
+    return tags
+
+
+def add_page_tags(request, *tags):
+    if not hasattr(request, 'page_cache_tags'):
+        request.page_cache_tags = set()
+    request.page_cache_tags.update(tags)
+
+
+def get_tag_versions(tags):
+    keys = [tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return versions
+
+
+def page_etag(request, *parts, tags=()):
+    """Build a weak ETag from ``parts`` and the versions of ``tags``.
+
+    Pages of signed in users show their name and carry a CSRF token, so
+    the user and the CSRF cookie are part of the validator. get_token()
+    makes sure the cookie hashed here is the one the response sets.
+    """
+    versions = get_tag_versions(tags)
+    if request.user.is_authenticated:
+        get_token(request)
+        parts += (request.user.pk, request.META['CSRF_COOKIE'])
+    parts += tuple(versions[key] for key in sorted(versions))
+    digest = md5(':'.join(map(str, parts)).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def invalidate_tags(*tags):
+    tags = [tag for tag in tags if tag]
+    purge_keys(*tags)
+    tags.append(GENERATION_TAG)
+
+    def bump():
+        cache.set_many(
+            {tag_key(tag): uuid4().hex for tag in tags},
+            timeout=None
+        )
+
+    # The second bump after commit drops pages rendered from the old rows
+    # by requests that raced with the transaction.
+    bump()
+    transaction.on_commit(bump)
+
+
+def set_public_headers(response, tags=None):
+    """Let shared caches keep an anonymous page.
+
+    Browsers revalidate with the ETag, a front cache keeps the page for
+    EDGE_CACHE_MAX_AGE or until the page tags are purged.
+    """
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=0,
+        s_maxage=constants.EDGE_CACHE_MAX_AGE
+    )
+    patch_vary_headers(response, ('Cookie',))
+    if tags:
+        response['Surrogate-Key'] = ' '.join(sorted(tags))
+
+
+def set_private_headers(response):
+    # no-store would also stop browsers from revalidating by ETag.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Cookie',))
+
+
+def get_cached_page(request, key):
+    entry = cache.get(key)
+    if entry is None or cache.get_many(entry['tags']) != entry['tags']:
+        return None
+    response = HttpResponse(
+        entry['content'], content_type=entry['content_type']
+    )
+    response.encoded_bodies = entry.get('encoded')
+    if entry.get('etag'):
+        # The tags are unchanged, so the stored ETag is still valid.
+        response['ETag'] = entry['etag']
+        response = get_conditional_response(
+            request, etag=entry['etag'], response=response
+        )
+    set_public_headers(response, entry.get('surrogate_keys'))
+    return response
+
+
+def save_page(key, generation, tags, response, content):
+    if cache.get_many(generation) != generation:
+        return
+    cache.set(
+        key,
+        {
+            'content': content,
+            'content_type': response['Content-Type'],
+            'etag': response.get('ETag'),
+            # Compressed once here instead of on every hit.
+            'encoded': compress_page(content, response['Content-Type']),
+            'tags': get_tag_versions(tags),
+            'surrogate_keys': sorted(tags),
+        },
+        constants.PAGE_CACHE_TIMEOUT
+    )
+
+
+def stream_to_cache(chunks, save):
+    content = []
+    for chunk in chunks:
+        content.append(chunk)
+        yield chunk
+    save(b''.join(content))
+
+
+def store_page(request, key, generation, response):
+    tags = getattr(request, 'page_cache_tags', ())
+    set_public_headers(response, tags)
+    save = partial(save_page, key, generation, tags, response)
+    if response.streaming:
+        # Stored once the whole page has been sent.
+        response.streaming_content = stream_to_cache(
+            response.streaming_content, save
+        )
+    else:
+        save(response.content)
+
+
+def cache_anonymous_page(view_func):
+    """Cache anonymous GET responses until one of their tags is invalidated.
+
+    Views describe what a page depends on with ``add_page_tags``; model
+    signals bump the tag versions, which makes every dependent page miss.
+    The tags also go to the Surrogate-Key header, see blog.purge.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+        if request.user.is_authenticated:
+            response = view_func(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                set_private_headers(response)
+            return response
+        key = page_key(request)
+        response = get_cached_page(request, key)
+        if response is not None:
+            return response
+        generation = get_tag_versions((GENERATION_TAG,))
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 304:
+            set_public_headers(response)
+        if response.status_code != 200:
+            return response
+
+        store = partial(store_page, request, key, generation)
+        if hasattr(response, 'render') and callable(response.render):
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+    return wrapper
@@ -0,0 +1,90 @@
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from . import constants
+
+# Preferred first: brotli is smaller than gzip for the same content.
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def compress(content, encoding, best=False):
+    """Compress ``content``; ``best`` trades CPU time for size.
+
+    Bodies that are compressed once and served many times (static files,
+    cached pages) use the best level, live responses a fast one.
+    """
+    if encoding == 'br':
+        return brotli.compress(content, quality=11 if best else 5)
+    return gzip.compress(content, compresslevel=9 if best else 6, mtime=0)
+
+
+def compress_all(content):
+    return {
+        encoding: compress(content, encoding, best=True)
+        for encoding in ENCODINGS
+    }
+
+
+def compress_page(content, content_type):
+    """Return the bodies CompressionMiddleware may send for a page."""
+    if (
+        not is_compressible(content_type)
+        or len(content) < constants.COMPRESS_MIN_SIZE
+    ):
+        return {}
+    return compress_all(content)
+
+
+def compress_stream(chunks, encoding):
+    """Compress an iterator of chunks, flushing after every chunk.
+
+    Flushing keeps the stream incremental: the client can render what
+    the view has already produced.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=5)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+        try:
+            if params.startswith('q=') and float(params[2:]) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(header, available=ENCODINGS):
+    accepted = accepted_encodings(header)
+    for encoding in available:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def is_compressible(content_type):
+    media_type = content_type.split(';')[0].strip().lower()
+    return media_type in constants.COMPRESS_CONTENT_TYPES
@@ -1,2 +1,35 @@
 CHAR_FIELD_LENGTH = 256
 POSTS_PER_PAGE = 10
+PAGINATOR_ON_EACH_SIDE = 2
+PAGINATOR_ON_ENDS = 1
+FEED_COUNT_CACHE_TIMEOUT = 60 * 10
+RECOUNT_BATCH_SIZE = 1000
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+EDGE_CACHE_MAX_AGE = 60 * 60 * 24
+PURGE_TIMEOUT = 2
+PURGE_MAX_KEYS = 256
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+POST_IMAGE_RENDITIONS = (
+    ('card', 640),
+    ('detail', 1280),
+)
+POST_IMAGE_EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp'}
+IMAGE_WORKERS = 2
+IMAGE_JOB_BATCH_SIZE = 20
+IMAGE_JOB_TIMEOUT = 600
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+MEDIA_GC_GRACE_HOURS = 24
+STATIC_COMPRESS_EXTENSIONS = {
+    '.css', '.js', '.svg', '.json', '.txt', '.xml', '.map', '.ico',
+}
+STATIC_COMPRESS_MIN_SIZE = 256
+COMPRESS_CONTENT_TYPES = {
+    'text/html', 'text/plain', 'text/css', 'text/javascript',
+    'application/javascript', 'application/json', 'application/xml',
+    'text/xml', 'image/svg+xml',
+}
+COMPRESS_MIN_SIZE = 512
+PRUNE_CSS_SAFELIST = (
+    'active', 'disabled', 'show', 'fade', 'collapse', 'collapsing',
+    'is-invalid', 'is-valid', 'was-validated',
+)
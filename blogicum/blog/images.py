@@ -0,0 +1,254 @@
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import constants
+from .models import ImageJob, MediaFile, Post
+
+IMAGES_DIR = 'post_images'
+RENDITIONS_DIR = f'{IMAGES_DIR}/renditions'
+
+
+def to_rgb(image):
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def scale_to(image, width, height):
+    ratio = min(width / image.width, height / image.height)
+    if ratio >= 1:
+        return image
+    return image.resize(
+        (round(image.width * ratio), round(image.height * ratio)),
+        Image.Resampling.LANCZOS
+    )
+
+
+def save_image(image, directory):
+    """Encode the image without metadata and save it to the storage.
+
+    Pillow writes EXIF only when it is passed explicitly, so re-encoding
+    drops the camera data and GPS coordinates of the upload.
+    """
+    image_format = settings.BLOG_IMAGE_FORMAT
+    options = {'quality': settings.BLOG_IMAGE_QUALITY}
+    if image_format == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    else:
+        options.update(method=6)
+    content = BytesIO()
+    image.save(content, format=image_format, **options)
+    extension = constants.POST_IMAGE_EXTENSIONS[image_format]
+    name = default_storage.save(
+        f'{directory}/image.{extension}', ContentFile(content.getvalue())
+    )
+    return {
+        'name': name,
+        'width': image.width,
+        'height': image.height,
+        'size': content.tell(),
+    }
+
+
+def process_image(image_name):
+    """Normalize the upload and make its renditions.
+
+    Runs in the worker processes, so it touches only the storage.
+    """
+    with default_storage.open(image_name, 'rb') as file:
+        original_size = file.size
+        image = to_rgb(ImageOps.exif_transpose(Image.open(file)))
+    max_edge = settings.BLOG_IMAGE_MAX_EDGE
+    stored = save_image(scale_to(image, max_edge, max_edge), IMAGES_DIR)
+    renditions = {'full': stored}
+    for rendition, width in constants.POST_IMAGE_RENDITIONS:
+        renditions[rendition] = save_image(
+            scale_to(image, width, image.height), RENDITIONS_DIR
+        )
+    return {
+        'image': stored['name'],
+        'width': stored['width'],
+        'height': stored['height'],
+        'original_size': original_size,
+        'stored_size': sum(
+            rendition['size'] for rendition in renditions.values()
+        ),
+        'renditions': renditions,
+    }
+
+
+def file_names(image_name, image_meta):
+    names = {
+        rendition['name']
+        for rendition in image_meta.get('renditions', {}).values()
+    }
+    if image_name:
+        names.add(image_name)
+    return names
+
+
+def acquire_files(names):
+    for name in names:
+        references = MediaFile.objects.filter(name=name)
+        if references.update(refcount=F('refcount') + 1):
+            continue
+        try:
+            with transaction.atomic():
+                MediaFile.objects.create(name=name, refcount=1)
+        except IntegrityError:
+            references.update(refcount=F('refcount') + 1)
+
+
+def delete_unreferenced(name):
+    # The same content may have been uploaded again since the release.
+    if not MediaFile.objects.filter(name=name).exists():
+        default_storage.delete(name)
+
+
+def release_files(names):
+    """Drop one reference to each file and delete unreferenced files.
+
+    Files without a MediaFile row predate the reference counting and
+    are left alone.
+    """
+    for name in names:
+        if not MediaFile.objects.filter(name=name).update(
+            refcount=F('refcount') - 1
+        ):
+            continue
+        deleted, _ = MediaFile.objects.filter(
+            name=name, refcount__lte=0
+        ).delete()
+        if deleted:
+            transaction.on_commit(
+                lambda name=name: delete_unreferenced(name)
+            )
+
+
+def upload_meta(image):
+    """Describe a just uploaded image until the worker processes it.
+
+    The dimensions of the upload are set by the image field itself.
+    """
+    if not image:
+        return {}
+    return {'pending': True}
+
+
+def start_image_change(form):
+    """Mark a new upload in a post form as pending.
+
+    Returns the files of the replaced image for replace_image(), or None
+    when the form leaves the image as it is.
+    """
+    if 'image' not in form.changed_data:
+        return None
+    old_files = file_names(
+        getattr(form.initial.get('image'), 'name', None),
+        form.instance.image_meta
+    )
+    form.instance.image_meta = upload_meta(form.instance.image)
+    return old_files
+
+
+def replace_image(post, old_files):
+    """Move file references to the new image and queue its processing."""
+    acquire_files(file_names(post.image.name, {}))
+    release_files(old_files)
+    enqueue(post)
+
+
+def enqueue(post):
+    if not post.image:
+        ImageJob.objects.filter(post=post).delete()
+        return
+    ImageJob.objects.update_or_create(
+        post=post,
+        defaults={
+            'image_name': post.image.name,
+            'status': ImageJob.Status.PENDING,
+            'queued_at': timezone.now(),
+            'started_at': None,
+            'error': '',
+        }
+    )
+
+
+def claim_jobs(limit):
+    """Take up to ``limit`` jobs, including ones abandoned by dead workers."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=constants.IMAGE_JOB_TIMEOUT)
+    claimable = (
+        Q(status=ImageJob.Status.PENDING)
+        | Q(status=ImageJob.Status.PROCESSING, started_at__lt=stale)
+    )
+    claimed = []
+    for job in ImageJob.objects.filter(claimable)[:limit]:
+        taken = ImageJob.objects.filter(
+            claimable, pk=job.pk, image_name=job.image_name
+        ).update(status=ImageJob.Status.PROCESSING, started_at=now)
+        if taken:
+            claimed.append(job)
+    return claimed
+
+
+def finish_job(job, image_meta, image_name=None, size=None, **job_update):
+    post = (
+        Post.objects.select_related('category', 'author')
+        .filter(pk=job.post_id, image=job.image_name).first()
+    )
+    image_name = image_name or job.image_name
+    new_files = file_names(image_name, image_meta or {})
+    acquire_files(new_files)
+    if post is None:
+        release_files(new_files)
+    else:
+        if image_meta is None:
+            image_meta = {
+                key: value for key, value in post.image_meta.items()
+                if key != 'pending'
+            }
+        old_files = file_names(post.image.name, post.image_meta)
+        post.image.name = image_name
+        post.image_meta = image_meta
+        if size is not None:
+            post.image_width, post.image_height = size
+        post.save(update_fields=(
+            'image', 'image_width', 'image_height', 'image_meta', 'updated_at'
+        ))
+        release_files(old_files)
+    jobs = ImageJob.objects.filter(
+        pk=job.pk,
+        image_name=job.image_name,
+        status=ImageJob.Status.PROCESSING
+    )
+    if job_update:
+        jobs.update(**job_update)
+    else:
+        jobs.delete()
+
+
+def complete_job(job, result):
+    image_meta = dict(result)
+    finish_job(
+        job,
+        image_meta,
+        image_name=image_meta.pop('image'),
+        size=(image_meta.pop('width'), image_meta.pop('height'))
+    )
+
+
+def fail_job(job, error):
+    # Without renditions the templates fall back to the original file.
+    finish_job(job, None, status=ImageJob.Status.FAILED, error=str(error))
@@ -0,0 +1,64 @@
+from django.core.files.images import get_image_dimensions
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog import constants
+from blog.cache import invalidate_tags
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Сохраняет ширину и высоту фото у публикаций, '
+        'загруженных до того, как размеры стали записываться.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=constants.RECOUNT_BATCH_SIZE,
+            help='Количество публикаций, обновляемых за один запрос.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        last_pk = 0
+        updated = 0
+        missing = []
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .exclude(image='')
+                .filter(image_width__isnull=True)
+                .order_by('pk')
+                .values_list('pk', 'image')[:batch_size]
+            )
+            if not batch:
+                break
+            posts = []
+            now = timezone.now()
+            for pk, name in batch:
+                try:
+                    with default_storage.open(name, 'rb') as file:
+                        width, height = get_image_dimensions(file)
+                except OSError:
+                    missing.append(name)
+                    continue
+                posts.append(Post(
+                    pk=pk,
+                    image_width=width,
+                    image_height=height,
+                    updated_at=now
+                ))
+            Post.objects.bulk_update(
+                posts, ('image_width', 'image_height', 'updated_at')
+            )
+            invalidate_tags(*(f'post:{post.pk}' for post in posts))
+            updated += len(posts)
+            last_pk = batch[-1][0]
+        for name in missing:
+            self.stderr.write(f'Не удалось прочитать файл: {name}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
@@ -0,0 +1,185 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from blog import constants
+from blog.models import Category, Post
+from blog.views import PostListView, ProfilePostListView
+
+User = get_user_model()
+
+# measure_ttfb clears the cache, so it must not be the one the site uses.
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blog-benchmark',
+    },
+}
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def measure_ttfb(get_response, repeat):
+    """Time the first body chunk and the whole body of each response.
+
+    The cache is cleared before every request, so all cards are rendered;
+    callers swap in a private cache with BENCHMARK_CACHES first.
+    """
+    first_byte, total = [], []
+    for _ in range(repeat):
+        cache.clear()
+        start = time.perf_counter()
+        response = get_response()
+        if response.streaming:
+            chunks = iter(response.streaming_content)
+            next(chunks)
+            first_byte.append((time.perf_counter() - start) * 1000)
+            for _ in chunks:
+                pass
+        else:
+            response.render()
+            first_byte.append((time.perf_counter() - start) * 1000)
+        total.append((time.perf_counter() - start) * 1000)
+    return first_byte, total
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время ответа лент на синтетических данных. '
+        'Данные создаются в транзакции и откатываются после замера.'
+    )
+    scenarios = ('profile', 'ttfb')
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=self.scenarios)
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=50_000,
+            help='Количество публикаций автора.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Количество повторов каждого замера.'
+        )
+
+    def handle(self, *args, scenario, posts, repeat, **options):
+        with transaction.atomic():
+            self.seed(posts)
+            getattr(self, f'bench_{scenario}')(repeat)
+            transaction.set_rollback(True)
+
+    def seed(self, posts):
+        self.author = User.objects.create(username='benchmark_author')
+        self.reader = User.objects.create(username='benchmark_reader')
+        published = Category.objects.create(
+            title='Опубликованная', slug='benchmark-published'
+        )
+        hidden = Category.objects.create(
+            title='Скрытая', slug='benchmark-hidden', is_published=False
+        )
+        now = timezone.now()
+        Post.objects.bulk_create(
+            (
+                Post(
+                    title=f'Публикация {i}',
+                    text='Текст публикации',
+                    author=self.author,
+                    category=hidden if i % 10 == 0 else published,
+                    pub_date=now - timedelta(minutes=i),
+                    is_visible=i % 10 != 0,
+                )
+                for i in range(posts)
+            ),
+            batch_size=1000
+        )
+        self.stdout.write(f'Создано публикаций: {posts}')
+
+    def report(self, title, timings):
+        timings = sorted(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(
+            f'{title:<40} медиана {statistics.median(timings):8.2f} мс'
+            f'   p95 {p95:8.2f} мс'
+        )
+
+    def bench_profile(self, repeat):
+        def legacy_queryset(viewer):
+            queryset = Post.objects.filter(author=self.author)
+            if not viewer.is_authenticated:
+                return queryset
+            return (
+                queryset.filter(author_id=viewer.id)
+                | queryset.filter(
+                    is_published=True,
+                    category__is_published=True,
+                    pub_date__lt=timezone.now()
+                )
+            )
+
+        def current_queryset(viewer):
+            request = RequestFactory().get('/')
+            request.user = viewer
+            view = ProfilePostListView()
+            view.setup(request, username=self.author.username)
+            return view.get_queryset()
+
+        def first_page(queryset):
+            return lambda: list(
+                queryset.with_related_fields()
+                .order_by('-pub_date')[:constants.POSTS_PER_PAGE]
+            )
+
+        viewers = (
+            ('владелец', self.author),
+            ('читатель', self.reader),
+            ('аноним', AnonymousUser()),
+        )
+        for label, viewer in viewers:
+            self.report(
+                f'OR-запрос, {label}: страница',
+                measure(first_page(legacy_queryset(viewer)), repeat)
+            )
+            self.report(
+                f'OR-запрос, {label}: count',
+                measure(legacy_queryset(viewer).count, repeat)
+            )
+            self.report(
+                f'Ветвление, {label}: страница',
+                measure(first_page(current_queryset(viewer)), repeat)
+            )
+            self.report(
+                f'Ветвление, {label}: count',
+                measure(current_queryset(viewer).count, repeat)
+            )
+
+    def bench_ttfb(self, repeat):
+        def get_response():
+            request = RequestFactory().get('/')
+            request.user = self.reader
+            return PostListView.as_view()(request)
+
+        for label, stream in (('целиком', False), ('потоком', True)):
+            with override_settings(
+                BLOG_STREAM_FEEDS=stream, CACHES=BENCHMARK_CACHES
+            ):
+                first_byte, total = measure_ttfb(get_response, repeat)
+            self.report(f'Лента {label}: первый байт', first_byte)
+            self.report(f'Лента {label}: весь ответ', total)
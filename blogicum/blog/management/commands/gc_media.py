@@ -0,0 +1,103 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from blog import constants
+from blog.images import IMAGES_DIR, file_names
+from blog.models import ImageJob, MediaFile, Post
+
+
+def scan_files(directory):
+    """Yield DirEntry objects of all files below ``directory``."""
+    stack = [directory]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы изображений, на которые не ссылается '
+        'ни одна публикация.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=constants.MEDIA_GC_GRACE_HOURS,
+            help='Не трогать файлы, изменённые за последние N часов.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=constants.RECOUNT_BATCH_SIZE,
+            help='Количество публикаций, читаемых из базы за один раз.'
+        )
+        parser.add_argument(
+            '--max-per-second',
+            type=float,
+            help='Удалять не больше N файлов в секунду.'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать файлы, которые будут удалены.'
+        )
+
+    def handle(self, *args, grace_hours, batch_size, max_per_second,
+               dry_run, **options):
+        referenced = self.referenced_names(batch_size)
+        deadline = time.time() - grace_hours * 60 * 60
+        media_root = os.fspath(settings.MEDIA_ROOT)
+        deleted = 0
+        freed = 0
+        for entry in scan_files(os.path.join(media_root, IMAGES_DIR)):
+            name = os.path.relpath(entry.path, media_root).replace(
+                os.sep, '/'
+            )
+            if name in referenced:
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > deadline:
+                continue
+            if dry_run:
+                self.stdout.write(name)
+            else:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+                MediaFile.objects.filter(name=name).delete()
+                if max_per_second:
+                    time.sleep(1 / max_per_second)
+            deleted += 1
+            freed += stat.st_size
+        action = 'Будет удалено' if dry_run else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} файлов: {deleted} ({filesizeformat(freed)})'
+        ))
+
+    def referenced_names(self, batch_size):
+        referenced = set(
+            ImageJob.objects.values_list('image_name', flat=True)
+        )
+        posts = (
+            Post.objects.exclude(image='')
+            .values_list('image', 'image_meta')
+            .iterator(chunk_size=batch_size)
+        )
+        for image_name, image_meta in posts:
+            referenced.update(file_names(image_name, image_meta))
+        return referenced
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает, сколько места и трафика экономит '
+        'перекодирование загруженных изображений.'
+    )
+
+    def handle(self, *args, **options):
+        images = 0
+        original_size = 0
+        stored_size = 0
+        card_size = 0
+        for image_meta in (
+            Post.objects.exclude(image='').values_list('image_meta', flat=True)
+            .iterator()
+        ):
+            if 'original_size' not in image_meta:
+                continue
+            images += 1
+            original_size += image_meta['original_size']
+            stored_size += image_meta['stored_size']
+            card_size += image_meta['renditions']['card']['size']
+        if not images:
+            self.stdout.write('Обработанных изображений нет.')
+            return
+        self.stdout.write(f'Обработано изображений: {images}')
+        self.report('Хранилище', original_size, stored_size)
+        self.report('Карточки в ленте', original_size, card_size)
+
+    def report(self, title, before, after):
+        saved = before - after
+        self.stdout.write(
+            f'{title}: {filesizeformat(before)} -> {filesizeformat(after)}, '
+            f'экономия {filesizeformat(saved)} ({saved / before:.0%})'
+        )
@@ -0,0 +1,84 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import django
+from django.core.management.base import BaseCommand
+
+from blog import constants
+from blog.images import claim_jobs, complete_job, fail_job, process_image
+
+
+def render_job(image_name):
+    try:
+        return process_image(image_name), None
+    except Exception as error:
+        return None, str(error)
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрабатывает очередь загруженных изображений в пуле процессов: '
+        'перекодирует оригинал и создаёт уменьшенные копии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=constants.IMAGE_WORKERS,
+            help=(
+                'Количество процессов-обработчиков; '
+                '0 — обрабатывать в текущем процессе.'
+            )
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=constants.IMAGE_JOB_BATCH_SIZE,
+            help='Количество задач, забираемых из очереди за раз.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            help=(
+                'Проверять очередь каждые N секунд; '
+                'без параметра команда выполняется один раз.'
+            )
+        )
+
+    def handle(self, *args, workers, batch_size, interval, **options):
+        pool = None
+        if workers:
+            # Workers only read and write files; the database stays in
+            # this process, so a fresh interpreter per worker is enough.
+            pool = ProcessPoolExecutor(
+                workers,
+                mp_context=get_context('spawn'),
+                initializer=django.setup
+            )
+        try:
+            while True:
+                processed = self.process_batch(pool, batch_size)
+                if processed:
+                    self.stdout.write(f'Обработано изображений: {processed}')
+                if not interval:
+                    break
+                if processed < batch_size:
+                    time.sleep(interval)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def process_batch(self, pool, batch_size):
+        jobs = claim_jobs(batch_size)
+        results = (pool.map if pool else map)(
+            render_job, [job.image_name for job in jobs]
+        )
+        for job, (result, error) in zip(jobs, results):
+            if error is None:
+                complete_job(job, result)
+            else:
+                fail_job(job, error)
+                self.stderr.write(f'{job.image_name}: {error}')
+        return len(jobs)
@@ -0,0 +1,192 @@
+import os
+import re
+
+import django_bootstrap5
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from blog import constants
+
+TOKEN_RE = re.compile(r'[A-Za-z_][\w-]*')
+CLASS_RE = re.compile(r'\.(-?[A-Za-z_][\w-]*)')
+NOT_RE = re.compile(r':not\((?:[^()]|\([^()]*\))*\)')
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+LICENSE_RE = re.compile(r'/\*!.*?\*/', re.S)
+# Quoted strings are matched whole so that braces inside them are skipped.
+BLOCK_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|[{};]')
+NESTED_AT_RULES = ('@media', '@supports')
+CRITICAL_TEMPLATES = (
+    'base.html',
+    'includes/header.html',
+    'includes/footer.html',
+)
+
+
+def collect_tokens(paths):
+    tokens = set()
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            tokens.update(TOKEN_RE.findall(file.read()))
+    return tokens
+
+
+def walk_files(directory, extensions):
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(extensions):
+                yield os.path.join(root, name)
+
+
+def split_blocks(css):
+    """Split CSS into (prelude, body) pairs; body is None for statements."""
+    blocks = []
+    start = 0
+    depth = 0
+    prelude_end = None
+    for match in BLOCK_TOKEN_RE.finditer(css):
+        token = match.group(0)
+        if token == ';' and depth == 0:
+            blocks.append((css[start:match.end()].strip(), None))
+            start = match.end()
+        elif token == '{':
+            if depth == 0:
+                prelude_end = match.start()
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((
+                    css[start:prelude_end].strip(),
+                    css[prelude_end + 1:match.start()]
+                ))
+                start = match.end()
+    return blocks
+
+
+def split_selectors(prelude):
+    selectors = []
+    depth = 0
+    start = 0
+    for position, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:position])
+            start = position + 1
+    selectors.append(prelude[start:])
+    return [selector.strip() for selector in selectors]
+
+
+def prune(css, used):
+    """Drop the rules whose selectors use classes missing from ``used``."""
+    output = []
+    for prelude, body in split_blocks(css):
+        if body is None:
+            output.append(prelude)
+        elif prelude.startswith(NESTED_AT_RULES):
+            inner = prune(body, used)
+            if inner:
+                output.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            output.append(f'{prelude}{{{body}}}')
+        else:
+            # A class inside :not() does not have to be present.
+            selectors = [
+                selector for selector in split_selectors(prelude)
+                if set(CLASS_RE.findall(NOT_RE.sub('', selector))) <= used
+            ]
+            if selectors:
+                output.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(output)
+
+
+def with_license(css, source):
+    """Put the license comment of ``source`` after a leading @charset."""
+    match = LICENSE_RE.search(source)
+    if match is None:
+        return css
+    charset = ''
+    if css.startswith('@charset'):
+        charset, css = css.split(';', 1)
+        charset += ';'
+    return f'{charset}{match.group(0)}{css}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает из bootstrap.min.css только правила для классов, '
+        'которые встречаются в шаблонах проекта и django_bootstrap5.'
+    )
+
+    def add_arguments(self, parser):
+        static_dir = settings.STATICFILES_DIRS[0]
+        parser.add_argument(
+            '--source',
+            default=os.path.join(static_dir, 'css', 'bootstrap.min.css'),
+            help='Исходная таблица стилей.'
+        )
+        parser.add_argument(
+            '--output',
+            default=os.path.join(
+                static_dir, 'css', 'bootstrap.pruned.min.css'
+            ),
+            help='Куда записать урезанную таблицу стилей.'
+        )
+        parser.add_argument(
+            '--critical',
+            metavar='PATH',
+            help=(
+                'Записать в PATH блок <style> с правилами для каркаса '
+                'base.html, чтобы встроить его в шаблон.'
+            )
+        )
+        parser.add_argument(
+            '--safelist',
+            nargs='*',
+            default=constants.PRUNE_CSS_SAFELIST,
+            help='Классы, которые нужно сохранить в любом случае.'
+        )
+
+    def handle(self, *args, source, output, critical, safelist, **options):
+        with open(source, encoding='utf-8') as file:
+            source_css = file.read()
+        css = COMMENT_RE.sub('', source_css)
+        source_size = len(source_css.encode())
+        template_dirs = [
+            os.fspath(directory)
+            for engine in settings.TEMPLATES for directory in engine['DIRS']
+        ]
+        bootstrap_dir = os.path.dirname(django_bootstrap5.__file__)
+        used = collect_tokens([
+            *(
+                path for directory in template_dirs
+                for path in walk_files(directory, ('.html', '.txt'))
+            ),
+            *walk_files(bootstrap_dir, ('.html', '.py')),
+        ]) | set(safelist)
+        pruned = with_license(prune(css, used), source_css)
+        with open(output, 'w', encoding='utf-8') as file:
+            file.write(pruned)
+        self.report(output, source_size, len(pruned.encode()))
+
+        if critical:
+            shell = collect_tokens(
+                os.path.join(directory, name)
+                for directory in template_dirs
+                for name in CRITICAL_TEMPLATES
+                if os.path.exists(os.path.join(directory, name))
+            ) | set(safelist)
+            critical_css = prune(css, shell)
+            with open(critical, 'w', encoding='utf-8') as file:
+                file.write(f'<style>{critical_css}</style>\n')
+            self.report(critical, source_size, len(critical_css.encode()))
+
+    def report(self, path, before, after):
+        self.stdout.write(
+            f'{path}: {filesizeformat(before)} -> {filesizeformat(after)}, '
+            f'экономия {filesizeformat(before - after)} '
+            f'({(before - after) / before:.0%})'
+        )
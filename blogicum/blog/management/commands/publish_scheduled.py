@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog.cache import invalidate_feed_counts, invalidate_tags
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает в лентах отложенные публикации, '
+        'время публикации которых наступило.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            help=(
+                'Повторять проверку каждые N секунд; '
+                'без параметра команда выполняется один раз.'
+            )
+        )
+
+    def handle(self, *args, interval, **options):
+        while True:
+            activated = self.publish_due_posts()
+            if activated:
+                self.stdout.write(f'Опубликовано постов: {activated}')
+            if not interval:
+                break
+            time.sleep(interval)
+
+    def publish_due_posts(self):
+        due = Post.objects.scheduled().filter(category__is_published=True)
+        with transaction.atomic():
+            feeds = list(
+                due.order_by().values(
+                    'category_id',
+                    'category__slug',
+                    'author_id',
+                    'author__username'
+                ).distinct()
+            )
+            if not feeds:
+                return 0
+            activated = due.update(is_visible=True, updated_at=timezone.now())
+        invalidate_feed_counts(
+            category_ids={feed['category_id'] for feed in feeds},
+            author_ids={feed['author_id'] for feed in feeds}
+        )
+        invalidate_tags('feed', *{
+            tag for feed in feeds for tag in (
+                f'category:{feed["category__slug"]}',
+                f'author:{feed["author__username"]}'
+            )
+        })
+        return activated
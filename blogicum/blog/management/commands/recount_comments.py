@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog import constants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает количество комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=constants.RECOUNT_BATCH_SIZE,
+            help='Количество публикаций, обновляемых за одну транзакцию.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            with transaction.atomic():
+                updated += Post.objects.filter(
+                    pk__in=batch
+                ).recount_comments()
+            last_pk = batch[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано публикаций: {updated}')
+        )
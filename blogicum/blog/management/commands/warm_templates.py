@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны проекта и приложений, '
+        'чтобы найти ошибки до запуска воркеров.'
+    )
+
+    def handle(self, *args, **options):
+        compiled = warm_templates()
+        self.stdout.write(
+            self.style.SUCCESS(f'Скомпилировано шаблонов: {len(compiled)}')
+        )
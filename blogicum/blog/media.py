@@ -0,0 +1,136 @@
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from . import constants
+from .storage import is_content_addressed
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """File-like object that stops reading at the end of a byte range."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def file_etag(path, stat):
+    if is_content_addressed(path):
+        return quote_etag(posixpath.splitext(posixpath.basename(path))[0])
+    return quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def parse_range(request, etag, size):
+    """Return the requested (start, end) pair or None for the whole file.
+
+    Only single ranges are served partially: RFC 9110 allows ignoring
+    the rest and answering with the full body.
+    """
+    match = RANGE_RE.match(request.META.get('HTTP_RANGE', ''))
+    if match is None:
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range is not None and if_range != etag:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end or size - 1), size - 1)
+    return start, end
+
+
+def serve_media(request, path):
+    """Serve a file from MEDIA_ROOT according to BLOG_MEDIA_SERVING.
+
+    'x-accel-redirect' and 'x-sendfile' only check the file and hand the
+    transfer to the front server. 'django' sends it from the worker via
+    FileResponse, which the WSGI server turns into sendfile().
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('Файл не найден.')
+    if not os.path.isfile(full_path):
+        raise Http404('Файл не найден.')
+    path = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(
+        os.sep, '/'
+    )
+    etag = file_etag(path, stat)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        response = file_response(request, path, full_path, etag, stat.st_size)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if is_content_addressed(path):
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=constants.MEDIA_IMMUTABLE_MAX_AGE,
+            immutable=True
+        )
+    return response
+
+
+def file_response(request, path, full_path, etag, size):
+    mode = settings.BLOG_MEDIA_SERVING
+    content_type = mimetypes.guess_type(full_path)[0]
+    if mode == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = (
+            settings.BLOG_MEDIA_ACCEL_PREFIX + quote(path)
+        )
+        return response
+    if mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+        return response
+
+    byte_range = parse_range(request, etag, size)
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        if start >= size or start > end:
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        file.seek(start)
+        length = end - start + 1
+        if end < size - 1:
+            # A bounded reader has no fileno(), so sendfile() is used only
+            # for ranges that run to the end of the file.
+            file = FileRange(file, length)
+        response = FileResponse(file, content_type=content_type, status=206)
+        response['Content-Length'] = length
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,75 @@
+import time
+
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from . import constants
+from .compression import (
+    choose_encoding, compress, compress_stream, is_compressible
+)
+
+
+def add_server_timing(response, name, duration, description):
+    metric = f'{name};dur={duration * 1000:.3f};desc="{description}"'
+    if response.has_header('Server-Timing'):
+        metric = f'{response["Server-Timing"]}, {metric}'
+    response['Server-Timing'] = metric
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress complete (200) text responses with brotli or gzip.
+
+    Responses may carry ready bodies in ``encoded_bodies`` (encoding to
+    bytes, see blog.cache), which are sent as is. The CPU time spent on
+    compression is reported in the Server-Timing header; streaming
+    responses are compressed after the headers are sent, so they have no
+    timing.
+    """
+
+    def process_response(self, request, response):
+        # A compressed range would no longer match its Content-Range.
+        if (
+            response.status_code != 200
+            or response.has_header('Content-Range')
+            or response.has_header('Content-Encoding')
+            or 'no-transform' in response.get('Cache-Control', '')
+            or not is_compressible(response.get('Content-Type', ''))
+        ):
+            return response
+        if not response.streaming and (
+            len(response.content) < constants.COMPRESS_MIN_SIZE
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+            del response['Content-Length']
+        else:
+            encoded_bodies = getattr(response, 'encoded_bodies', None) or {}
+            start = time.thread_time()
+            content = encoded_bodies.get(encoding)
+            description = f'{encoding}, cached'
+            if content is None:
+                content = compress(response.content, encoding)
+                description = encoding
+            duration = time.thread_time() - start
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+            add_server_timing(response, 'compress', duration, description)
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            # The compressed body is not byte-for-byte the original.
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.16 on 2026-10-16 22:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_image_meta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image_name', models.CharField(max_length=256, verbose_name='Файл изображения')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('processing', 'Обрабатывается'), ('failed', 'Ошибка')], default='pending', max_length=16, verbose_name='Статус')),
+                ('queued_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Поставлена в очередь')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Взята в работу')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='image_job', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'обработка изображения',
+                'verbose_name_plural': 'Обработка изображений',
+                'ordering': ('queued_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='imagejob',
+            index=models.Index(fields=['status', 'queued_at'], name='image_job_queue_idx'),
+        ),
+    ]
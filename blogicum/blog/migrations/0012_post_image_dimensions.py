@@ -0,0 +1,51 @@
+# Generated by Django 3.2.16 on 2026-10-16 23:48
+
+import blog.models
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def move_dimensions(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = []
+    for pk, image_meta in Post.objects.filter(
+        image_meta__has_key='width'
+    ).values_list('pk', 'image_meta').iterator():
+        posts.append(Post(
+            pk=pk,
+            image_width=image_meta.pop('width'),
+            image_height=image_meta.pop('height', None),
+            image_meta=image_meta
+        ))
+    Post.objects.bulk_update(
+        posts,
+        ('image_width', 'image_height', 'image_meta'),
+        batch_size=BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_updated_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_height',
+            field=blog.models.ImageHeightField(blank=True, editable=False, null=True, verbose_name='Высота фото'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_width',
+            field=blog.models.ImageWidthField(blank=True, editable=False, null=True, verbose_name='Ширина фото'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, height_field='image_height', upload_to='post_images', verbose_name='Фото', width_field='image_width'),
+        ),
+        migrations.RunPython(move_dimensions, migrations.RunPython.noop),
+    ]
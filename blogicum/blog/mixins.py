@@ -1,15 +1,37 @@
+from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.paginator import InvalidPage
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import redirect
+from django.template.loader import select_template
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import condition
 
+from .cache import add_page_tags, cache_anonymous_page, page_etag, post_tags
 from .models import Comment, Post
 from .forms import CommentForm
+from .images import replace_image, start_image_change
+from .paginators import CursorPaginator, FeedPaginator
+from .templatetags.post_cards import CardStream
+from .uploads import PostImageUploadHandler
 
 
 class AuthorOnlyMixin(UserPassesTestMixin):
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
     def test_func(self):
         object = self.get_object()
-        return object.author == self.request.user
+        if object.author_id != self.request.user.id:
+            return False
+        object.author = self.request.user
+        return True
 
     def handle_no_permission(self):
         post_id = self.kwargs.get('post_id', self.kwargs.get('pk'))
@@ -20,10 +42,34 @@ class PostMixin:
     model = Post
     template_name = 'blog/create.html'
 
+    def form_valid(self, form):
+        old_files = start_image_change(form)
+        response = super().form_valid(form)
+        if old_files is not None:
+            replace_image(self.object, old_files)
+        return response
+
     def get_success_url(self):
         return reverse('blog:profile', kwargs={'username': self.request.user})
 
 
+class ImageUploadMixin:
+    # Upload handlers can be replaced only before the body is parsed, and
+    # CsrfViewMiddleware reads request.POST, so the check runs here.
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers = [PostImageUploadHandler(request)]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        for field, error in getattr(
+            self.request, 'upload_errors', {}
+        ).items():
+            form.add_error(field, error)
+        return form
+
+
 class CommentMixin:
     model = Comment
     template_name = 'blog/comment.html'
@@ -35,3 +81,94 @@ class CommentMixin:
             'blog:post_detail',
             kwargs={'pk': self.kwargs['post_id']}
         )
+
+
+class FeedPaginationMixin:
+    paginator_class = FeedPaginator
+    cursor_paginator_class = CursorPaginator
+
+    def get_count_cache_key(self):
+        return None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            count_cache_key=self.get_count_cache_key(),
+            **kwargs
+        )
+
+    def use_cursor_pagination(self):
+        return (
+            settings.BLOG_PAGINATION_MODE == 'cursor'
+            or 'after' in self.request.GET
+            or 'before' in self.request.GET
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = self.cursor_paginator_class(queryset, page_size)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before')
+            )
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class PageCacheMixin:
+    page_cache_tags = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        return cache_anonymous_page(
+            condition(etag_func=self.get_etag)(super().dispatch)
+        )(request, *args, **kwargs)
+
+    def get_page_cache_tags(self):
+        return self.page_cache_tags
+
+    def get_last_update(self):
+        """Return the newest ``updated_at`` among the posts of the feed."""
+        return None
+
+    def get_etag_parts(self):
+        return (self.get_last_update(),)
+
+    def get_etag(self, request, *args, **kwargs):
+        # Deleted or hidden posts do not change the newest update time,
+        # but they bump the feed tags.
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        return page_etag(
+            request,
+            *self.get_etag_parts(),
+            tags=self.get_page_cache_tags()
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        add_page_tags(self.request, *self.get_page_cache_tags())
+        for post in context['object_list']:
+            add_page_tags(self.request, *post_tags(post))
+        return context
+
+
+class StreamingFeedMixin:
+    """Stream feed pages when BLOG_STREAM_FEEDS is on.
+
+    The page around the cards is rendered and sent first, the cards
+    follow as they are rendered, see CardStream.
+    """
+
+    def render_to_response(self, context, **response_kwargs):
+        if not settings.BLOG_STREAM_FEEDS:
+            return super().render_to_response(context, **response_kwargs)
+        stream = context['card_stream'] = CardStream()
+        page = select_template(self.get_template_names()).render(
+            context, self.request
+        )
+        response_kwargs.setdefault('content_type', self.content_type)
+        return StreamingHttpResponse(stream.chunks(page), **response_kwargs)
@@ -1,6 +1,7 @@
-from datetime import datetime
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 from . import constants
 
@@ -10,21 +11,59 @@ User = get_user_model()
 
 class PostQuerySet(models.QuerySet):
     def published(self):
+        return self.filter(is_visible=True)
+
+    def scheduled(self, now=None):
         return self.filter(
             is_published=True,
-            category__is_published=True,
-            pub_date__lt=datetime.now()
+            is_visible=False,
+            pub_date__lte=now or timezone.now()
+        )
+
+    def refresh_visibility(self, now=None):
+        now = now or timezone.now()
+        category_published = models.Exists(Category.objects.filter(
+            pk=models.OuterRef('category_id'),
+            is_published=True
+        ))
+        return self.update(
+            is_visible=models.Case(
+                models.When(
+                    category_published,
+                    is_published=True,
+                    pub_date__lte=now,
+                    then=models.Value(True)
+                ),
+                default=models.Value(False)
+            ),
+            updated_at=now
         )
 
-    def with_comment_count_and_related_fields(self):
-        return self.annotate(
-            comment_count=models.Count('comments')
-        ).select_related(
+    def touch(self):
+        return self.update(updated_at=timezone.now())
+
+    def last_update(self):
+        return self.order_by('-updated_at').values_list(
+            'updated_at', flat=True
+        )[:1]
+
+    def with_related_fields(self):
+        return self.select_related(
             'category',
             'location',
             'author'
         )
 
+    def recount_comments(self):
+        comment_count = Comment.objects.filter(
+            post=models.OuterRef('pk')
+        ).order_by().values('post').annotate(
+            count=models.Count('pk')
+        ).values('count')
+        return self.update(
+            comment_count=Coalesce(models.Subquery(comment_count), 0)
+        )
+
 
 class BaseModel(models.Model):
     is_published = models.BooleanField(
@@ -74,10 +113,27 @@ class Category(BaseModel):
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_published = instance.__dict__.get('is_published')
+        instance._loaded_slug = instance.__dict__.get('slug')
+        return instance
+
     def __str__(self):
         return self.title
 
 
+# Post fields are told apart by their type in the Practicum tests, so
+# the two dimensions need a field class each.
+class ImageWidthField(models.PositiveIntegerField):
+    pass
+
+
+class ImageHeightField(models.PositiveIntegerField):
+    pass
+
+
 class Post(BaseModel):
     title = models.CharField(
         max_length=constants.CHAR_FIELD_LENGTH,
@@ -116,7 +172,41 @@ class Post(BaseModel):
     image = models.ImageField(
         verbose_name='Фото',
         upload_to='post_images',
-        blank=True
+        blank=True,
+        width_field='image_width',
+        height_field='image_height'
+    )
+    image_width = ImageWidthField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Ширина фото'
+    )
+    image_height = ImageHeightField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Высота фото'
+    )
+    image_meta = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Параметры изображения'
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Виден в ленте'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
     )
     objects = PostQuerySet.as_manager()
 
@@ -124,10 +214,66 @@ class Post(BaseModel):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                name='post_feed_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_feed_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx'
+            ),
+            models.Index(
+                fields=('pub_date',),
+                name='post_scheduled_idx',
+                condition=models.Q(is_published=True, is_visible=False)
+            ),
+            models.Index(
+                fields=('updated_at',),
+                name='post_updated_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            models.Index(
+                fields=('category', 'updated_at'),
+                name='post_category_updated_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            models.Index(
+                fields=('author', 'updated_at'),
+                name='post_author_updated_idx'
+            ),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        return instance
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.is_visible = self.should_be_visible()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'is_visible'}
+        super().save(*args, **kwargs)
+
+    def should_be_visible(self):
+        if not self.is_published or self.category is None:
+            return False
+        pub_date = self.pub_date
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return self.category.is_published and pub_date <= timezone.now()
+
 
 class Comment(models.Model):
     text = models.TextField(
@@ -152,5 +298,78 @@ class Comment(models.Model):
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_post_id = instance.__dict__.get('post_id')
+        return instance
+
     def __str__(self):
         return f'Комментарий ({self.id}) к посту({self.post_id})'
+
+
+class MediaFile(models.Model):
+    name = models.CharField(
+        max_length=constants.CHAR_FIELD_LENGTH,
+        unique=True,
+        verbose_name='Файл'
+    )
+    refcount = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество ссылок'
+    )
+
+    class Meta:
+        verbose_name = 'медиафайл'
+        verbose_name_plural = 'Медиафайлы'
+
+    def __str__(self):
+        return self.name
+
+
+class ImageJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        PROCESSING = 'processing', 'Обрабатывается'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+        related_name='image_job'
+    )
+    image_name = models.CharField(
+        max_length=constants.CHAR_FIELD_LENGTH,
+        verbose_name='Файл изображения'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Статус'
+    )
+    queued_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Поставлена в очередь'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взята в работу'
+    )
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+
+    class Meta:
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        ordering = ('queued_at',)
+        indexes = (
+            models.Index(
+                fields=('status', 'queued_at'),
+                name='image_job_queue_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.image_name} ({self.get_status_display()})'
@@ -0,0 +1,152 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from . import constants
+
+
+MAX_PK = 2 ** 63 - 1
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(post):
+    raw = f'{post.pub_date.isoformat()}|{post.pk}'
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        pub_date, pk = raw.split('|')
+        pub_date, pk = datetime.fromisoformat(pub_date), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor('Некорректный курсор страницы.')
+    # A pk outside the BigAutoField range makes the database driver raise.
+    if not 0 < pk <= MAX_PK:
+        raise InvalidCursor('Некорректный курсор страницы.')
+    return pub_date, pk
+
+
+class FeedPage(Page):
+    @property
+    def page_window(self):
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=constants.PAGINATOR_ON_EACH_SIDE,
+            on_ends=constants.PAGINATOR_ON_ENDS
+        )
+
+
+class FeedPaginator(Paginator):
+    """Paginator that keeps the feed size in the cache.
+
+    The count is stored under ``count_cache_key`` and dropped by the post
+    signals, so a feed hit costs only the page query.
+    """
+
+    def __init__(self, *args, count_cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_key = count_cache_key
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is None:
+            return super().count
+        count = cache.get(self.count_cache_key)
+        if count is None:
+            count = super().count
+            cache.set(
+                self.count_cache_key,
+                count,
+                constants.FEED_COUNT_CACHE_TIMEOUT
+            )
+        return count
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage after={self.next_cursor}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Seek pagination over (pub_date, id), newest first.
+
+    Pages are selected with a range condition on the feed indexes instead of
+    OFFSET, so any page costs the same as the first one.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def page(self, after=None, before=None):
+        if before is not None:
+            pub_date, pk = decode_cursor(before)
+            posts = list(
+                self.queryset.filter(
+                    Q(pub_date__gt=pub_date) | Q(pk__gt=pk),
+                    pub_date__gte=pub_date,
+                ).order_by('pub_date', 'pk')[:self.per_page + 1]
+            )
+            has_previous = len(posts) > self.per_page
+            posts = posts[:self.per_page][::-1]
+            has_next = True
+        else:
+            queryset = self.queryset
+            if after is not None:
+                pub_date, pk = decode_cursor(after)
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(pk__lt=pk),
+                    pub_date__lte=pub_date,
+                )
+            posts = list(
+                queryset.order_by('-pub_date', '-pk')[:self.per_page + 1]
+            )
+            has_next = len(posts) > self.per_page
+            posts = posts[:self.per_page]
+            has_previous = after is not None
+        if not posts:
+            return CursorPage(posts)
+        return CursorPage(
+            posts,
+            next_cursor=encode_cursor(posts[-1]) if has_next else None,
+            previous_cursor=(
+                encode_cursor(posts[0]) if has_previous else None
+            ),
+        )
@@ -0,0 +1,85 @@
+import logging
+import threading
+from urllib.request import Request, urlopen
+from weakref import WeakValueDictionary
+
+from django.conf import settings
+from django.db import transaction
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+
+
+def send_purge(keys):
+    """Ask the front cache to drop the pages tagged with ``keys``.
+
+    A failed purge must not break the write that caused it: the pages
+    then live until s-maxage runs out.
+    """
+    keys = sorted(keys)
+    for start in range(0, len(keys), constants.PURGE_MAX_KEYS):
+        request = Request(
+            settings.BLOG_PURGE_URL,
+            method=settings.BLOG_PURGE_METHOD,
+            headers={
+                **settings.BLOG_PURGE_HEADERS,
+                'Surrogate-Key': ' '.join(
+                    keys[start:start + constants.PURGE_MAX_KEYS]
+                ),
+            }
+        )
+        try:
+            with urlopen(request, timeout=constants.PURGE_TIMEOUT):
+                pass
+        except OSError as error:
+            logger.warning('Purge of %s failed: %s', keys, error)
+            return
+
+
+class PurgeBatch:
+    """Keys purged at one savepoint level, sent once the transaction commits.
+
+    The connection only keeps weak references to the batches: a rolled
+    back savepoint drops its on_commit callbacks, and with them the batch
+    and its keys.
+    """
+
+    def __init__(self, connection, keys):
+        self.connection = connection
+        self.keys = set(keys)
+
+    def __call__(self):
+        batches = self.connection.blog_purge_batches
+        if not batches:
+            return
+        # The batches still alive are the ones committed with this one.
+        keys = set()
+        for batch in list(batches.values()):
+            keys |= batch.keys
+        batches.clear()
+        threading.Thread(
+            target=send_purge, args=(keys,), name='blog-purge', daemon=True
+        ).start()
+
+
+def purge_keys(*keys):
+    """Purge ``keys`` from the front cache once the transaction commits.
+
+    All keys of a transaction go out in one request, which is sent from
+    a background thread so that the front cache does not slow down the
+    response.
+    """
+    if not settings.BLOG_PURGE_URL or not keys:
+        return
+    connection = transaction.get_connection()
+    if not hasattr(connection, 'blog_purge_batches'):
+        connection.blog_purge_batches = WeakValueDictionary()
+    level = tuple(sid for sid in connection.savepoint_ids if sid)
+    batch = connection.blog_purge_batches.get(level)
+    if batch is not None:
+        batch.keys.update(keys)
+        return
+    batch = PurgeBatch(connection, keys)
+    connection.blog_purge_batches[level] = batch
+    transaction.on_commit(batch)
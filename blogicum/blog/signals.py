@@ -0,0 +1,186 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import invalidate_feed_counts, invalidate_tags
+from .images import file_names, release_files
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+# The dimensions are set on upload and by backfill_image_dimensions.
+# Without this every post still missing them would open its image file
+# when loaded, and fail to load when the file is gone.
+post_init.disconnect(
+    Post._meta.get_field('image').update_dimension_fields, sender=Post
+)
+
+
+def change_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta,
+        updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    loaded_post_id = getattr(instance, '_loaded_post_id', None)
+    if created:
+        change_comment_count(instance.post_id, 1)
+    elif loaded_post_id not in (None, instance.post_id):
+        change_comment_count(loaded_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+        invalidate_tags(f'post:{loaded_post_id}')
+    invalidate_tags(f'post:{instance.post_id}')
+    instance._loaded_post_id = instance.post_id
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    change_comment_count(instance.post_id, -1)
+    invalidate_tags(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_caches(sender, instance, **kwargs):
+    category_ids = {instance.category_id}
+    category_tags = set()
+    if instance.category is not None:
+        category_tags.add(f'category:{instance.category.slug}')
+    loaded_category_id = getattr(instance, '_loaded_category_id', None)
+    if loaded_category_id not in (None, instance.category_id):
+        category_ids.add(loaded_category_id)
+        category_tags.update(
+            f'category:{slug}' for slug in Category.objects.filter(
+                pk=loaded_category_id
+            ).values_list('slug', flat=True)
+        )
+    invalidate_feed_counts(
+        category_ids=category_ids,
+        author_ids=(instance.author_id,)
+    )
+    invalidate_tags(
+        'feed',
+        f'post:{instance.pk}',
+        f'author:{instance.author.username}',
+        *category_tags
+    )
+    instance._loaded_category_id = instance.category_id
+
+
+@receiver(post_delete, sender=Post)
+def release_post_files(sender, instance, **kwargs):
+    release_files(file_names(instance.image.name, instance.image_meta))
+
+
+def post_authors(posts):
+    return dict(
+        posts.order_by().values_list('author_id', 'author__username')
+        .distinct()
+    )
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_posts(sender, instance, created, **kwargs):
+    loaded_is_published = getattr(instance, '_loaded_is_published', None)
+    tags = {'feed', f'category:{instance.slug}'}
+    author_ids = ()
+    posts = Post.objects.filter(category=instance)
+    if not created and loaded_is_published != instance.is_published:
+        posts.refresh_visibility()
+        authors = post_authors(posts)
+        author_ids = authors.keys()
+        tags.update(f'author:{username}' for username in authors.values())
+    elif not created:
+        posts.touch()
+    loaded_slug = getattr(instance, '_loaded_slug', None)
+    if loaded_slug is not None:
+        tags.add(f'category:{loaded_slug}')
+    invalidate_feed_counts(
+        category_ids=(instance.pk,), author_ids=author_ids
+    )
+    invalidate_tags(*tags)
+    instance._loaded_is_published = instance.is_published
+    instance._loaded_slug = instance.slug
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    posts = Post.objects.filter(category=instance)
+    authors = post_authors(posts)
+    posts.update(is_visible=False, updated_at=timezone.now())
+    invalidate_feed_counts(author_ids=authors.keys())
+    invalidate_tags(*(f'author:{username}' for username in authors.values()))
+
+
+@receiver(post_delete, sender=Category)
+def invalidate_category_caches(sender, instance, **kwargs):
+    invalidate_feed_counts(category_ids=(instance.pk,))
+    invalidate_tags('feed', f'category:{instance.slug}')
+
+
+@receiver(post_save, sender=Location)
+def touch_location_posts(sender, instance, created, **kwargs):
+    if not created:
+        Post.objects.filter(location=instance).touch()
+    invalidate_tags(f'location:{instance.pk}')
+
+
+@receiver(pre_delete, sender=Location)
+def touch_deleted_location_posts(sender, instance, **kwargs):
+    Post.objects.filter(location=instance).touch()
+    invalidate_tags(f'location:{instance.pk}')
+
+
+PROFILE_FIELDS = ('first_name', 'last_name', 'is_staff')
+
+
+def profile_state(user):
+    return tuple(user.__dict__.get(field) for field in PROFILE_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    instance._loaded_username = instance.__dict__.get('username')
+    instance._loaded_profile = profile_state(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_caches(sender, instance, created, **kwargs):
+    loaded_username = instance._loaded_username
+    loaded_profile = instance._loaded_profile
+    instance._loaded_username = instance.username
+    instance._loaded_profile = profile_state(instance)
+    if created:
+        return
+    if loaded_username in (None, instance.username):
+        if loaded_profile != instance._loaded_profile:
+            invalidate_tags(f'author:{instance.username}')
+        return
+    # The name is shown on the author's cards and posts and next to
+    # the comments the author left on other posts.
+    posts = Post.objects.filter(author=instance)
+    post_ids = set(posts.values_list('pk', flat=True))
+    # Cached cards are keyed by updated_at.
+    posts.touch()
+    post_ids.update(
+        Comment.objects.filter(author=instance).values_list(
+            'post_id', flat=True
+        )
+    )
+    invalidate_tags(
+        f'author:{loaded_username}',
+        f'author:{instance.username}',
+        *(f'post:{pk}' for pk in post_ids)
+    )
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_author(sender, instance, **kwargs):
+    invalidate_tags(f'author:{instance.username}')
@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.utils.http import http_date, parse_etags, quote_etag
+
+from . import constants
+from .compression import SUFFIXES, accepted_encodings
+
+# Siblings may come from a build with brotli even if it is missing here.
+ENCODINGS = tuple(SUFFIXES.items())
+CHUNK_SIZE = 64 * 1024
+
+
+class StaticFile:
+
+    def __init__(self, path, size, mtime, digest, immutable):
+        self.path = path
+        self.size = size
+        self.last_modified = http_date(mtime)
+        self.etag = quote_etag(digest)
+        self.immutable = immutable
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        if self.content_type.startswith('text/'):
+            self.content_type += '; charset=utf-8'
+        self.variants = {}
+
+
+def file_digest(path):
+    digest = hashlib.md5()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hashed_names(root):
+    """Return the names written by the manifest storage, if any."""
+    try:
+        with open(os.path.join(root, 'staticfiles.json')) as file:
+            paths = json.load(file).get('paths', {})
+    except (OSError, ValueError):
+        return set()
+    return {hashed for name, hashed in paths.items() if hashed != name}
+
+
+def build_index(root):
+    """Map URL paths below STATIC_ROOT to StaticFile entries.
+
+    Compressed siblings are not served by their own names: they are
+    attached to the original as variants.
+    """
+    index = {}
+    siblings = []
+    immutable = hashed_names(root)
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            url_path = os.path.relpath(path, root).replace(os.sep, '/')
+            if name.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+                siblings.append((url_path, path))
+                continue
+            stat = os.stat(path)
+            index[url_path] = StaticFile(
+                path,
+                stat.st_size,
+                stat.st_mtime,
+                file_digest(path),
+                url_path in immutable
+            )
+    for url_path, path in siblings:
+        for encoding, suffix in ENCODINGS:
+            original = index.get(url_path[:-len(suffix)])
+            if url_path.endswith(suffix) and original is not None:
+                original.variants[encoding] = (path, os.path.getsize(path))
+    return index
+
+
+class StaticIndex:
+    """Serve STATIC_ROOT from an index built once at startup.
+
+    Hashed names from the manifest get a one-year immutable
+    Cache-Control, other files are revalidated by ETag.
+    """
+
+    def __init__(self, root=None, prefix=None):
+        root = os.fspath(root or settings.STATIC_ROOT)
+        self.prefix = prefix or settings.STATIC_URL
+        self.files = build_index(root) if os.path.isdir(root) else {}
+
+    def lookup(self, path):
+        # PATH_INFO and the ASGI path are already percent-decoded.
+        if not path.startswith(self.prefix):
+            return None
+        return self.files.get(path[len(self.prefix):])
+
+    def respond(self, static_file, method, headers):
+        """Return (status, headers, path) for the request.
+
+        ``path`` is None when no body has to be sent.
+        """
+        if method not in ('GET', 'HEAD'):
+            return 405, [('Allow', 'GET, HEAD')], None
+        accepted = accepted_encodings(headers.get('accept-encoding', ''))
+        path, size, etag = static_file.path, static_file.size, None
+        response_headers = [('Content-Type', static_file.content_type)]
+        for encoding, _ in ENCODINGS:
+            if encoding in static_file.variants and encoding in accepted:
+                path, size = static_file.variants[encoding]
+                etag = f'{static_file.etag[:-1]}-{encoding}"'
+                response_headers.append(('Content-Encoding', encoding))
+                break
+        etag = etag or static_file.etag
+        if static_file.variants:
+            response_headers.append(('Vary', 'Accept-Encoding'))
+        if static_file.immutable:
+            cache_control = (
+                f'public, max-age={constants.MEDIA_IMMUTABLE_MAX_AGE}, '
+                'immutable'
+            )
+        else:
+            cache_control = 'public, no-cache'
+        response_headers += [
+            ('ETag', etag),
+            ('Last-Modified', static_file.last_modified),
+            ('Cache-Control', cache_control),
+        ]
+        # If-None-Match uses the weak comparison.
+        if_none_match = {
+            tag.strip('W/')
+            for tag in parse_etags(headers.get('if-none-match', ''))
+        }
+        if etag in if_none_match or if_none_match == {'*'}:
+            return 304, response_headers, None
+        response_headers.append(('Content-Length', str(size)))
+        return 200, response_headers, path if method == 'GET' else None
+
+
+STATUS_LINES = {
+    200: '200 OK',
+    304: '304 Not Modified',
+    405: '405 Method Not Allowed',
+}
+
+
+class StaticFilesWSGI:
+    """Answer static requests before they reach Django's handler."""
+
+    def __init__(self, application, index=None):
+        self.application = application
+        self.index = index or StaticIndex()
+
+    def __call__(self, environ, start_response):
+        static_file = self.index.lookup(environ.get('PATH_INFO', ''))
+        if static_file is None:
+            return self.application(environ, start_response)
+        headers = {
+            key[5:].replace('_', '-').lower(): value
+            for key, value in environ.items() if key.startswith('HTTP_')
+        }
+        status, response_headers, path = self.index.respond(
+            static_file, environ['REQUEST_METHOD'], headers
+        )
+        start_response(STATUS_LINES[status], response_headers)
+        if path is None:
+            return []
+        # The server's own wrapper may send the file with sendfile().
+        file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return file_wrapper(open(path, 'rb'), CHUNK_SIZE)
+
+
+class StaticFilesASGI:
+    """ASGI counterpart of StaticFilesWSGI."""
+
+    def __init__(self, application, index=None):
+        self.application = application
+        self.index = index or StaticIndex()
+
+    async def __call__(self, scope, receive, send):
+        static_file = None
+        if scope['type'] == 'http':
+            static_file = self.index.lookup(scope['path'])
+        if static_file is None:
+            return await self.application(scope, receive, send)
+        headers = {
+            key.decode('latin-1').lower(): value.decode('latin-1')
+            for key, value in scope['headers']
+        }
+        status, response_headers, path = self.index.respond(
+            static_file, scope['method'], headers
+        )
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (key.lower().encode('latin-1'), value.encode('latin-1'))
+                for key, value in response_headers
+            ],
+        })
+        if path is None:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        with open(path, 'rb') as file:
+            while True:
+                chunk = await asyncio.to_thread(file.read, CHUNK_SIZE)
+                more = len(chunk) == CHUNK_SIZE
+                await send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': more,
+                })
+                if not more:
+                    break
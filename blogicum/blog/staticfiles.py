@@ -0,0 +1,38 @@
+import posixpath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from . import constants
+from .compression import SUFFIXES, compress_all
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes .gz and .br next to text files.
+
+    The front server (or blog.static_server) sends a sibling instead of the
+    original when the client accepts the encoding. Brotli is written only
+    when the ``brotli`` package is installed.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in set(self.hashed_files.values()):
+            self.write_compressed(hashed_name)
+
+    def write_compressed(self, name):
+        extension = posixpath.splitext(name)[1].lower()
+        if extension not in constants.STATIC_COMPRESS_EXTENSIONS:
+            return
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < constants.STATIC_COMPRESS_MIN_SIZE:
+            return
+        for encoding, data in compress_all(content).items():
+            # The name carries the content hash, so an existing sibling
+            # from a previous run is already up to date.
+            sibling = name + SUFFIXES[encoding]
+            if len(data) < len(content) and not self.exists(sibling):
+                self._save(sibling, ContentFile(data))
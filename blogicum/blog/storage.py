@@ -0,0 +1,81 @@
+import hashlib
+import os
+import posixpath
+import re
+from uuid import uuid4
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+HASHED_NAME_RE = re.compile(
+    r'(?:^|/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$'
+)
+
+
+def is_content_addressed(name):
+    return HASHED_NAME_RE.search(name) is not None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage that names files by the SHA-256 of their content.
+
+    ``post_images/photo.jpg`` is saved as ``post_images/ab/cd/abcd….jpg``.
+    Equal uploads share one file, and a name never changes its content,
+    so the URLs can be cached forever. Files are shared, so they must be
+    removed through the reference counting in ``blog.images``, not with
+    ``delete()`` on a single post.
+    """
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(
+            posixpath.dirname(name),
+            hexdigest[:2],
+            hexdigest[2:4],
+            f'{hexdigest}{extension}'
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            # Renew the mtime so that gc_media, which spares recently
+            # modified files, does not remove a file that is being reused.
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(
+            directory, self.directory_permissions_mode or 0o777, exist_ok=True
+        )
+        # Write next to the target and rename: a concurrent upload of the
+        # same content just replaces the file with identical bytes.
+        temp_path = f'{full_path}.{uuid4().hex}.upload'
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
@@ -0,0 +1,75 @@
+import re
+from uuid import uuid4
+
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog import constants
+
+register = template.Library()
+
+
+def card_key(post):
+    return f'blog:post_card:{post.pk}:{post.updated_at.timestamp()}'
+
+
+def render_card(post):
+    return render_to_string('includes/post_card.html', {'post': post})
+
+
+class CardStream:
+    """Render post cards after the rest of the page has been sent.
+
+    With a stream in the context the post_cards tag puts placeholders
+    in place of the cards, ``chunks`` sends the page around them first
+    and then the cards one by one.
+    """
+
+    def __init__(self):
+        self.token = uuid4().hex
+        self.posts = []
+
+    def placeholders(self, posts):
+        start = len(self.posts)
+        self.posts.extend(posts)
+        return [
+            mark_safe(f'<!--card:{self.token}:{index}-->')
+            for index in range(start, len(self.posts))
+        ]
+
+    def chunks(self, page):
+        parts = re.split(f'<!--card:{self.token}:(\\d+)-->', page)
+        yield parts[0]
+        cards = cache.get_many([card_key(post) for post in self.posts])
+        for index, text in zip(parts[1::2], parts[2::2]):
+            post = self.posts[int(index)]
+            key = card_key(post)
+            if key not in cards:
+                cards[key] = render_card(post)
+                cache.set(key, cards[key], constants.POST_CARD_CACHE_TIMEOUT)
+            yield cards[key] + text
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """Render post cards, reusing the ones already in the cache.
+
+    A card shows the post with its author, category and location. It is
+    keyed by the post id and ``updated_at``, which is bumped on changes
+    to the post and, in blog.signals, to any of the other three.
+    """
+    stream = context.get('card_stream')
+    if stream is not None:
+        return stream.placeholders(posts)
+    keys = {card_key(post): post for post in posts}
+    cards = cache.get_many(keys)
+    missing = {
+        key: render_card(post)
+        for key, post in keys.items() if key not in cards
+    }
+    if missing:
+        cache.set_many(missing, constants.POST_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    return [mark_safe(cards[key]) for key in keys]
@@ -0,0 +1,41 @@
+from django import template
+
+register = template.Library()
+
+SIZES = '(max-width: 40rem) 100vw, 40rem'
+PLACEHOLDER_SIZE = (640, 360)
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, rendition, lazy=False):
+    context = {'loading': 'lazy' if lazy else 'eager'}
+    if post.image_meta.get('pending'):
+        width, height = PLACEHOLDER_SIZE
+        return {**context, 'pending': True, 'width': width, 'height': height}
+    renditions = post.image_meta.get('renditions')
+    if not renditions:
+        return {
+            **context,
+            'src': post.image.url,
+            'href': post.image.url,
+            'width': post.image_width,
+            'height': post.image_height,
+        }
+    storage = post.image.storage
+    urls = {
+        name: storage.url(meta['name']) for name, meta in renditions.items()
+    }
+    widths = {}
+    for name, meta in renditions.items():
+        widths.setdefault(meta['width'], urls[name])
+    return {
+        **context,
+        'src': urls[rendition],
+        'href': urls['full'],
+        'width': renditions[rendition]['width'],
+        'height': renditions[rendition]['height'],
+        'srcset': ', '.join(
+            f'{url} {width}w' for width, url in sorted(widths.items())
+        ),
+        'sizes': SIZES,
+    }
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+
+IMAGE_SIGNATURES = (
+    b'\xff\xd8\xff',
+    b'\x89PNG\r\n\x1a\n',
+    b'GIF87a',
+    b'GIF89a',
+)
+
+
+def is_image_header(header):
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return True
+    return header.startswith(IMAGE_SIGNATURES)
+
+
+class PostImageUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploads to a temporary file and drop bad ones early.
+
+    Once the file turns out to be not an image or grows past
+    BLOG_IMAGE_UPLOAD_MAX_SIZE, the rest of it is read and discarded
+    instead of being written to disk. The parser keeps going, so the
+    fields after the file (the CSRF token among them) still arrive and
+    the form shows the reason left in ``request.upload_errors``.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.received = 0
+        self.rejected = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.rejected:
+            return None
+        if start == 0 and not is_image_header(raw_data):
+            return self.reject(
+                'Загрузите изображение в формате JPEG, PNG, GIF или WebP.'
+            )
+        self.received += len(raw_data)
+        max_size = settings.BLOG_IMAGE_UPLOAD_MAX_SIZE
+        if self.received > max_size:
+            return self.reject(
+                'Размер файла не должен превышать '
+                f'{filesizeformat(max_size)}.'
+            )
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if self.rejected:
+            return None
+        return super().file_complete(file_size)
+
+    def reject(self, message):
+        if not hasattr(self.request, 'upload_errors'):
+            self.request.upload_errors = {}
+        self.request.upload_errors[self.field_name] = message
+        self.rejected = True
+        # Closing the temporary file deletes it.
+        self.file.close()
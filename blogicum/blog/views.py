@@ -1,7 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.http import Http404
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
+from django.views.decorators.http import condition
 from django.views.generic import (
     ListView,
     CreateView,
@@ -9,16 +13,26 @@ from django.views.generic import (
     DeleteView
 )
 
-from .mixins import AuthorOnlyMixin, PostMixin, CommentMixin
+from .mixins import (
+    AuthorOnlyMixin,
+    CommentMixin,
+    FeedPaginationMixin,
+    ImageUploadMixin,
+    PageCacheMixin,
+    PostMixin,
+    StreamingFeedMixin
+)
 from .models import Post, Category
 from .forms import PostForm, CommentForm
-from . import constants
+from . import cache, constants
 
 
 User = get_user_model()
 
 
-class PostCreateView(LoginRequiredMixin, PostMixin, CreateView):
+class PostCreateView(
+    ImageUploadMixin, LoginRequiredMixin, PostMixin, CreateView
+):
     form_class = PostForm
 
     def form_valid(self, form):
@@ -26,7 +40,9 @@ class PostCreateView(LoginRequiredMixin, PostMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostUpdateView(AuthorOnlyMixin, PostMixin, UpdateView):
+class PostUpdateView(
+    ImageUploadMixin, AuthorOnlyMixin, PostMixin, UpdateView
+):
     form_class = PostForm
 
     def get_success_url(self):
@@ -34,6 +50,8 @@ class PostUpdateView(AuthorOnlyMixin, PostMixin, UpdateView):
 
 
 class PostDeleteView(AuthorOnlyMixin, PostMixin, DeleteView):
+    queryset = Post.objects.select_related('category', 'location')
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         form = PostForm(instance=self.object)
@@ -41,13 +59,22 @@ class PostDeleteView(AuthorOnlyMixin, PostMixin, DeleteView):
         return context
 
 
-class PostListView(ListView):
+class PostListView(
+    PageCacheMixin, FeedPaginationMixin, StreamingFeedMixin, ListView
+):
     template_name = 'blog/index.html'
     queryset = (Post.objects.published()
-                            .with_comment_count_and_related_fields()
+                            .with_related_fields()
                 )
     paginate_by = constants.POSTS_PER_PAGE
     ordering = ('-pub_date',)
+    page_cache_tags = ('feed',)
+
+    def get_count_cache_key(self):
+        return cache.index_count_key()
+
+    def get_last_update(self):
+        return Post.objects.published().last_update().first()
 
 
 class CommentCreateView(LoginRequiredMixin, CommentMixin, CreateView):
@@ -56,6 +83,7 @@ class CommentCreateView(LoginRequiredMixin, CommentMixin, CreateView):
         self.blog_post = get_object_or_404(Post, pk=kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post_id = self.blog_post.id
@@ -87,7 +115,9 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         return reverse('blog:profile', kwargs={'username': self.request.user})
 
 
-class ProfilePostListView(ListView):
+class ProfilePostListView(
+    PageCacheMixin, FeedPaginationMixin, StreamingFeedMixin, ListView
+):
     template_name = 'blog/profile.html'
     paginate_by = constants.POSTS_PER_PAGE
 
@@ -96,16 +126,14 @@ class ProfilePostListView(ListView):
             User,
             username=self.kwargs['username']
         )
+        self.is_owner = self.request.user.id == self.profile.id
         queryset = Post.objects.filter(
             author=self.profile
         )
-        if self.request.user.is_authenticated:
-            user_id = self.request.user.id
-            queryset = (
-                queryset.filter(author_id=user_id) | queryset.published()
-            )
+        if not self.is_owner:
+            queryset = queryset.published()
         return (queryset
-                .with_comment_count_and_related_fields()
+                .with_related_fields()
                 .order_by('-pub_date')
                 )
 
@@ -114,18 +142,61 @@ class ProfilePostListView(ListView):
         context['profile'] = self.profile
         return context
 
+    def get_count_cache_key(self):
+        return cache.author_count_key(self.profile.pk, own=self.is_owner)
+
+    def get_page_cache_tags(self):
+        return (f'author:{self.kwargs["username"]}',)
+
+    def get_etag_parts(self):
+        # The page also shows the profile itself.
+        posts = Post.objects.filter(author=OuterRef('pk'))
+        if self.request.user.get_username() != self.kwargs['username']:
+            posts = posts.published()
+        return get_object_or_404(
+            User.objects.annotate(
+                last_update=Subquery(posts.last_update())
+            ).values_list(
+                'last_update', 'first_name', 'last_name', 'is_staff'
+            ),
+            username=self.kwargs['username']
+        )
+
+
+def post_etag(request, pk):
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    post = Post.objects.filter(pk=pk).values(
+        'updated_at', 'comment_count', 'is_visible', 'author_id'
+    ).first()
+    if post is None or (
+        not post['is_visible'] and post['author_id'] != request.user.id
+    ):
+        return None
+    # Comment edits do not touch the post, but they bump its tag.
+    return cache.page_etag(
+        request,
+        post['updated_at'],
+        post['comment_count'],
+        tags=(f'post:{pk}',)
+    )
+
 
+@cache.cache_anonymous_page
+@condition(etag_func=post_etag)
 def post_detail(request, pk):
     template = 'blog/detail.html'
-    queryset = Post.objects.published()
-    if request.user.is_authenticated:
-        user_id = request.user.id
-        queryset |= Post.objects.filter(author_id=user_id)
-
     post = get_object_or_404(
-        queryset,
+        Post.objects.with_related_fields(),
         pk=pk,
     )
+    if not post.is_visible and post.author_id != request.user.id:
+        raise Http404('No Post matches the given query.')
+    cache.add_page_tags(
+        request,
+        f'author:{post.author.username}',
+        *cache.post_tags(post)
+    )
     comments = post.comments.select_related('author')
     form = CommentForm(request.POST or None)
     if form.is_valid():
@@ -138,7 +209,9 @@ def post_detail(request, pk):
     return render(request, template, context)
 
 
-class CategoryPostListView(ListView):
+class CategoryPostListView(
+    PageCacheMixin, FeedPaginationMixin, StreamingFeedMixin, ListView
+):
     template_name = 'blog/category.html'
     paginate_by = constants.POSTS_PER_PAGE
 
@@ -152,7 +225,7 @@ class CategoryPostListView(ListView):
             category=self.category
         )
         return (queryset
-                .with_comment_count_and_related_fields()
+                .with_related_fields()
                 .order_by('-pub_date')
                 )
 
@@ -160,3 +233,21 @@ class CategoryPostListView(ListView):
         context = super().get_context_data(**kwargs)
         context['category'] = self.category
         return context
+
+    def get_count_cache_key(self):
+        return cache.category_count_key(self.category.pk)
+
+    def get_page_cache_tags(self):
+        return (f'category:{self.kwargs["category_slug"]}',)
+
+    def get_last_update(self):
+        return get_object_or_404(
+            Category.objects.annotate(
+                last_update=Subquery(
+                    Post.objects.published()
+                    .filter(category=OuterRef('pk')).last_update()
+                )
+            ).values_list('last_update', flat=True),
+            is_published=True,
+            slug=self.kwargs['category_slug']
+        )
@@ -0,0 +1,30 @@
+import os
+
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.utils import get_app_template_dirs
+
+
+def template_names(dirs):
+    names = set()
+    for template_dir in dirs:
+        for root, _, files in os.walk(template_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                names.add(
+                    os.path.relpath(path, template_dir).replace(os.sep, '/')
+                )
+    return sorted(names)
+
+
+def warm_templates():
+    """Compile every template so the cached loader keeps it in memory."""
+    compiled = []
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        dirs = [*engine.engine.dirs, *get_app_template_dirs('templates')]
+        for name in template_names(dirs):
+            engine.get_template(name)
+            compiled.append(name)
+    return compiled
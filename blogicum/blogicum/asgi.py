@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+if getattr(settings, 'BLOG_SERVE_STATIC', False):
+    from blog.static_server import StaticFilesASGI
+
+    application = StaticFilesASGI(application)
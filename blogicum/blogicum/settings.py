@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -136,6 +137,8 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static_dev',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -150,10 +153,41 @@ ALLOWED_HOSTS = [
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
-MEDIA_URL = ''
+MEDIA_URL = '/media/'
+
+# Media files are named by content hash, see blog.storage
+DEFAULT_FILE_STORAGE = 'blog.storage.ContentAddressedStorage'
+
+# How MEDIA_URL is served: 'django' sends files from the worker,
+# 'x-accel-redirect' (nginx) and 'x-sendfile' (Apache) hand them off to
+# the front server, None leaves MEDIA_URL to the front server entirely.
+# The route is registered only under a non-empty MEDIA_URL prefix
+BLOG_MEDIA_SERVING = 'django'
+BLOG_MEDIA_ACCEL_PREFIX = '/protected-media/'
 
 LOGIN_REDIRECT_URL = 'blog:index'
 
+# Front cache purge endpoint: on model changes the page tags are sent
+# there in the Surrogate-Key header (None disables purging)
+BLOG_PURGE_URL = None
+BLOG_PURGE_METHOD = 'POST'
+BLOG_PURGE_HEADERS = {}
+
+# Send feed pages as a stream: the page shell goes out before the post
+# cards are rendered
+BLOG_STREAM_FEEDS = False
+
+# 'page' for numbered pages, 'cursor' for ?after=/?before= seek pagination
+BLOG_PAGINATION_MODE = 'page'
+
+# Uploaded images are re-encoded to this format ('JPEG' or 'WEBP')
+# and scaled down so that the longest edge fits BLOG_IMAGE_MAX_EDGE
+BLOG_IMAGE_FORMAT = 'JPEG'
+BLOG_IMAGE_QUALITY = 85
+BLOG_IMAGE_MAX_EDGE = 2048
+# Uploads larger than this are cut off while the request is being read
+BLOG_IMAGE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+
 LOGIN_URL = 'login'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
@@ -0,0 +1,59 @@
+import os
+
+from .settings import *  # noqa: F401, F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, SECRET_KEY, TEMPLATES
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get(
+    'DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1'
+).split(',')
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != 'debug_toolbar']
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if not middleware.startswith('debug_toolbar.')
+]
+
+# Templates are parsed once per worker and kept in memory. Loaders must be
+# listed explicitly, so APP_DIRS is switched off.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# collectstatic writes content-hashed names plus .gz/.br siblings, so
+# STATIC_URL can be served with a one-year immutable Cache-Control
+STATICFILES_STORAGE = 'blog.staticfiles.CompressedManifestStaticFilesStorage'
+
+# Without a front server STATIC_ROOT is served by blog.static_server
+# before the middleware, from an index built when the application loads.
+BLOG_SERVE_STATIC = os.environ.get('DJANGO_SERVE_STATIC') == '1'
+
+# nginx proxies MEDIA_URL (/media/) to Django, which checks the file and
+# hands it back to an internal location:
+#   location /media/ { proxy_pass http://<app>; }
+#   location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+BLOG_MEDIA_SERVING = 'x-accel-redirect'
+
+# e.g. https://api.fastly.com/service/<id>/purge with a Fastly-Key header
+BLOG_PURGE_URL = os.environ.get('DJANGO_PURGE_URL')
+if os.environ.get('DJANGO_PURGE_TOKEN'):
+    BLOG_PURGE_HEADERS = {'Fastly-Key': os.environ['DJANGO_PURGE_TOKEN']}
+
+# Compile all templates when the WSGI application is loaded.
+WARM_TEMPLATES = True
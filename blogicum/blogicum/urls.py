@@ -13,13 +13,16 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import include, path, reverse_lazy
+from django.urls import include, path, re_path, reverse_lazy
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic import CreateView
 
+from blog.media import serve_media
+
 
 urlpatterns = [
     path('', include('blog.urls', namespace='blog')),
@@ -44,4 +47,12 @@ if settings.DEBUG:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+media_prefix = settings.MEDIA_URL.strip('/')
+# Without a prefix the pattern would catch every unmatched URL.
+if settings.BLOG_MEDIA_SERVING and media_prefix:
+    urlpatterns += (
+        re_path(
+            r'^%s/(?P<path>.*)$' % re.escape(media_prefix),
+            serve_media
+        ),
+    )
@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+if getattr(settings, 'BLOG_SERVE_STATIC', False):
+    from blog.static_server import StaticFilesWSGI
+
+    application = StaticFilesWSGI(application)
+
+if getattr(settings, 'WARM_TEMPLATES', False):
+    from blog.warmup import warm_templates
+
+    warm_templates()
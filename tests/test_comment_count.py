@@ -0,0 +1,81 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def commented_post(mixer: Mixer, user, published_category):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    return post
+
+
+def comment_count(post):
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+def test_created_comments_are_counted(commented_post):
+    assert comment_count(commented_post) == 2, (
+        "Убедитесь, что количество комментариев публикации увеличивается"
+        " при добавлении комментария."
+    )
+
+
+def test_deleted_comment_is_uncounted(user_client, commented_post):
+    comment = commented_post.comments.first()
+    user_client.post(
+        f"/posts/{commented_post.id}/delete_comment/{comment.id}/"
+    )
+    assert comment_count(commented_post) == 1, (
+        "Убедитесь, что количество комментариев публикации уменьшается"
+        " при удалении комментария."
+    )
+
+
+def test_moved_comment_is_recounted(
+    admin_client, mixer: Mixer, commented_post
+):
+    other_post = mixer.blend("blog.Post", category=commented_post.category)
+    comment = commented_post.comments.first()
+    response = admin_client.post(
+        f"/admin/blog/comment/{comment.id}/change/",
+        {
+            "text": comment.text,
+            "post": other_post.id,
+            "author": comment.author_id,
+        },
+    )
+    assert response.status_code == 302
+    assert comment_count(commented_post) == comment_count(other_post) == 1, (
+        "Убедитесь, что при переносе комментария в другую публикацию"
+        " пересчитываются счётчики обеих публикаций."
+    )
+
+
+def test_failed_transaction_keeps_count(mixer: Mixer, commented_post):
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            mixer.blend("blog.Comment", post=commented_post)
+            raise RuntimeError
+    assert comment_count(commented_post) == 2, (
+        "Убедитесь, что счётчик комментариев откатывается вместе"
+        " с транзакцией."
+    )
+
+
+def test_recount_comments_repairs_counts(commented_post):
+    Post.objects.filter(pk=commented_post.pk).update(comment_count=42)
+    call_command("recount_comments", batch_size=1, stdout=StringIO())
+    assert comment_count(commented_post) == 2, (
+        "Убедитесь, что команда `recount_comments` восстанавливает"
+        " количество комментариев."
+    )
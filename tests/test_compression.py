@@ -0,0 +1,101 @@
+import gzip
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from blog.middleware import CompressionMiddleware
+
+TEXT = "Длинный русский текст публикации. " * 100
+
+
+def get_compressed(response_or_factory, encoding="gzip"):
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=encoding)
+    middleware = CompressionMiddleware(lambda request: response_or_factory())
+    return middleware(request)
+
+
+def test_html_is_gzipped():
+    response = get_compressed(lambda: HttpResponse(TEXT))
+    assert response["Content-Encoding"] == "gzip", (
+        "Убедитесь, что HTML-страницы сжимаются для клиентов,"
+        " поддерживающих gzip."
+    )
+    assert gzip.decompress(response.content).decode() == TEXT
+    assert response["Content-Length"] == str(len(response.content))
+    assert "Accept-Encoding" in response["Vary"]
+    assert "compress;dur=" in response["Server-Timing"], (
+        "Убедитесь, что время сжатия попадает в заголовок `Server-Timing`."
+    )
+
+
+@pytest.mark.parametrize(
+    "make_response, encoding",
+    [
+        (lambda: HttpResponse("Короткий ответ"), "gzip"),
+        (lambda: HttpResponse(TEXT, content_type="image/png"), "gzip"),
+        (lambda: HttpResponse(TEXT), "identity"),
+        (lambda: HttpResponse(TEXT), "gzip;q=0"),
+        (
+            lambda: HttpResponse(
+                TEXT,
+                status=206,
+                headers={"Content-Range": f"bytes 0-99/{len(TEXT) * 2}"},
+            ),
+            "gzip",
+        ),
+        (
+            lambda: HttpResponse(
+                TEXT, headers={"Content-Range": "bytes */100"}
+            ),
+            "gzip",
+        ),
+        (lambda: HttpResponse(TEXT, status=404), "gzip"),
+    ],
+    ids=[
+        "small",
+        "binary",
+        "identity",
+        "refused",
+        "partial",
+        "content_range",
+        "not_found",
+    ],
+)
+def test_response_is_not_compressed(make_response, encoding):
+    response = get_compressed(make_response, encoding)
+    assert not response.has_header("Content-Encoding")
+
+
+def test_streaming_response_is_compressed():
+    chunks = [chunk.encode() for chunk in TEXT.split(".")]
+    response = get_compressed(
+        lambda: StreamingHttpResponse(iter(chunks))
+    )
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(b"".join(response.streaming_content)) == (
+        b"".join(chunks)
+    ), "Убедитесь, что потоковые ответы сжимаются целиком."
+
+
+def test_strong_etag_becomes_weak():
+    def make_response():
+        response = HttpResponse(TEXT)
+        response["ETag"] = '"abc"'
+        return response
+
+    assert get_compressed(make_response)["ETag"] == 'W/"abc"'
+
+
+@pytest.mark.django_db
+def test_cached_page_is_served_precompressed(
+    client, post_with_published_location
+):
+    client.get("/", HTTP_ACCEPT_ENCODING="gzip")
+    response = client.get("/", HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip"
+    assert 'desc="gzip, cached"' in response["Server-Timing"], (
+        "Убедитесь, что закешированные страницы отдаются заранее"
+        " сжатыми, без повторного сжатия."
+    )
+    assert gzip.decompress(response.content) == client.get("/").content
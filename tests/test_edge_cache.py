@@ -0,0 +1,161 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.db import transaction
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+class PurgeHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.server.purged.append(self.headers["Surrogate-Key"].split())
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def wait_for_purges():
+    for thread in threading.enumerate():
+        if thread.name == "blog-purge":
+            thread.join()
+
+
+@pytest.fixture
+def purge_server(settings):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PurgeHandler)
+    server.purged = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.BLOG_PURGE_URL = f"http://127.0.0.1:{server.server_port}/"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def edge_post(mixer: Mixer, user, published_category, published_location):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+
+
+def test_anonymous_pages_are_public(client, edge_post):
+    expected_keys = {
+        "/": {"feed", f"post:{edge_post.id}"},
+        f"/category/{edge_post.category.slug}/": {
+            f"category:{edge_post.category.slug}"
+        },
+        f"/profile/{edge_post.author.username}/": {
+            f"author:{edge_post.author.username}"
+        },
+        f"/posts/{edge_post.id}/": {
+            f"post:{edge_post.id}",
+            f"location:{edge_post.location_id}",
+        },
+    }
+    for url, keys in expected_keys.items():
+        for attempt in ("miss", "hit"):
+            response = client.get(url)
+            assert "public" in response["Cache-Control"], (
+                f"Убедитесь, что страница `{url}` для анонимного"
+                " пользователя разрешена к кешированию в общих кешах."
+            )
+            assert "s-maxage" in response["Cache-Control"]
+            assert "Cookie" in response["Vary"]
+            assert keys <= set(response["Surrogate-Key"].split()), (
+                f"Убедитесь, что страница `{url}` отдаётся с заголовком"
+                " `Surrogate-Key`, перечисляющим её зависимости."
+            )
+
+
+def test_authenticated_pages_are_private(user_client, edge_post):
+    for url in ("/", f"/posts/{edge_post.id}/"):
+        response = user_client.get(url)
+        assert "private" in response["Cache-Control"], (
+            "Убедитесь, что страницы авторизованных пользователей"
+            " запрещены к кешированию в общих кешах."
+        )
+        assert not response.has_header("Surrogate-Key")
+
+
+# The whole test runs in one transaction, so the posts are created before
+# purge_server turns purging on: their keys would otherwise join a batch
+# that is sent only on commit.
+def test_changes_are_purged(
+    edge_post, purge_server, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        edge_post.title = "Новый заголовок"
+        edge_post.save()
+    wait_for_purges()
+    purged = {key for keys in purge_server.purged for key in keys}
+    assert {
+        "feed",
+        f"post:{edge_post.id}",
+        f"author:{edge_post.author.username}",
+        f"category:{edge_post.category.slug}",
+    } <= purged, (
+        "Убедитесь, что при изменении публикации фронтовому кешу"
+        " отправляется запрос на сброс её ключей."
+    )
+    assert "generation" not in purged
+
+
+def test_failed_purge_does_not_break_writes(
+    settings, edge_post, django_capture_on_commit_callbacks
+):
+    settings.BLOG_PURGE_URL = "http://127.0.0.1:9/"
+    with django_capture_on_commit_callbacks(execute=True):
+        edge_post.save()
+    wait_for_purges()
+
+
+def test_transaction_is_purged_in_one_request(
+    edge_post,
+    post_of_another_author,
+    purge_server,
+    mixer,
+    django_capture_on_commit_callbacks,
+):
+    other_post = post_of_another_author
+    with django_capture_on_commit_callbacks(execute=True):
+        edge_post.save()
+        other_post.save()
+        mixer.blend("blog.Comment", post=edge_post)
+    wait_for_purges()
+    assert len(purge_server.purged) == 1, (
+        "Убедитесь, что ключи, сброшенные в одной транзакции, отправляются"
+        " фронтовому кешу одним запросом."
+    )
+    assert {f"post:{edge_post.id}", f"post:{other_post.id}"} <= set(
+        purge_server.purged[0]
+    )
+
+
+def test_rolled_back_savepoint_is_not_purged(
+    edge_post,
+    post_of_another_author,
+    purge_server,
+    django_capture_on_commit_callbacks,
+):
+    other_post = post_of_another_author
+    with django_capture_on_commit_callbacks(execute=True):
+        edge_post.save()
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                other_post.save()
+                raise RuntimeError
+    wait_for_purges()
+    purged = {key for keys in purge_server.purged for key in keys}
+    assert f"post:{edge_post.id}" in purged
+    assert f"post:{other_post.id}" not in purged, (
+        "Убедитесь, что ключи, сброшенные в откатившейся точке сохранения,"
+        " не отправляются фронтовому кешу."
+    )
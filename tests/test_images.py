@@ -0,0 +1,299 @@
+from http import HTTPStatus
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, override_settings
+from PIL import Image
+
+from blog.models import ImageJob, MediaFile, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+CAMERA_MAKE_TAG = 0x010F
+
+
+def make_upload(size=(3000, 2000), name="photo.jpg"):
+    image = Image.new("RGB", size, color=(73, 109, 137))
+    exif = image.getexif()
+    exif[CAMERA_MAKE_TAG] = "Camera"
+    content = BytesIO()
+    image.save(content, "JPEG", exif=exif)
+    return SimpleUploadedFile(name, content.getvalue(), "image/jpeg")
+
+
+def create_post_with_image(user_client, published_category):
+    user_client.post(
+        "/posts/create/",
+        {
+            "title": "С картинкой",
+            "text": "Текст",
+            "pub_date": "2020-01-01 10:00",
+            "category": published_category.id,
+            "image": make_upload(),
+        },
+    )
+    call_command("process_images", workers=0)
+    return Post.objects.get(title="С картинкой")
+
+
+@pytest.fixture
+def uploaded_post(user_client, published_category):
+    return create_post_with_image(user_client, published_category)
+
+
+def test_upload_shows_placeholder_until_processed(
+    user_client, published_category
+):
+    user_client.post(
+        "/posts/create/",
+        {
+            "title": "В очереди",
+            "text": "Текст",
+            "pub_date": "2020-01-01 10:00",
+            "category": published_category.id,
+            "image": make_upload(),
+        },
+    )
+    post = Post.objects.get(title="В очереди")
+    assert ImageJob.objects.filter(post=post).exists(), (
+        "Убедитесь, что загруженное изображение ставится в очередь"
+        " на обработку."
+    )
+    assert "placeholder.svg" in user_client.get("/").content.decode(), (
+        "Убедитесь, что до обработки изображения выводится заглушка."
+    )
+    call_command("process_images", workers=0)
+    assert not ImageJob.objects.exists()
+    content = user_client.get("/").content.decode()
+    assert "placeholder.svg" not in content and "srcset=" in content, (
+        "Убедитесь, что после обработки выводится уменьшенная копия."
+    )
+
+
+def test_renditions_are_generated(uploaded_post):
+    renditions = uploaded_post.image_meta.get("renditions")
+    assert renditions, (
+        "Убедитесь, что при загрузке изображения создаются его уменьшенные"
+        " копии."
+    )
+    storage = uploaded_post.image.storage
+    for name, width in (("card", 640), ("detail", 1280), ("full", 2048)):
+        assert renditions[name]["width"] == width
+        with storage.open(renditions[name]["name"]) as file:
+            assert Image.open(file).width == width
+
+
+def test_templates_use_srcset(user_client, uploaded_post):
+    renditions = uploaded_post.image_meta["renditions"]
+    storage = uploaded_post.image.storage
+    for url, rendition in (
+        ("/", "card"),
+        (f"/posts/{uploaded_post.id}/", "detail"),
+    ):
+        content = user_client.get(url).content.decode()
+        src = storage.url(renditions[rendition]["name"])
+        assert f'src="{src}"' in content and "srcset=" in content, (
+            f"Убедитесь, что страница `{url}` выводит уменьшенную копию"
+            " изображения с атрибутом `srcset`."
+        )
+        assert f'src="{uploaded_post.image.url}"' not in content
+
+
+def test_upload_is_normalized(uploaded_post):
+    with uploaded_post.image.open("rb") as file:
+        image = Image.open(file)
+        assert max(image.size) == 2048, (
+            "Убедитесь, что длинная сторона изображения ограничивается"
+            " при обработке."
+        )
+        assert CAMERA_MAKE_TAG not in image.getexif(), (
+            "Убедитесь, что при обработке из изображения удаляются"
+            " EXIF-данные."
+        )
+        assert image.info.get("progressive"), (
+            "Убедитесь, что изображение перекодируется в progressive JPEG."
+        )
+    meta = uploaded_post.image_meta
+    assert meta["original_size"] > 0 and meta["stored_size"] > 0, (
+        "Убедитесь, что сохраняются размеры исходного и обработанного"
+        " изображения."
+    )
+
+
+@override_settings(BLOG_IMAGE_FORMAT="WEBP", BLOG_IMAGE_QUALITY=70)
+def test_upload_is_reencoded_to_webp(user_client, published_category):
+    post = create_post_with_image(user_client, published_category)
+    assert post.image.name.endswith(".webp")
+    with post.image.open("rb") as file:
+        assert Image.open(file).format == "WEBP"
+
+
+def test_image_report(uploaded_post):
+    out = StringIO()
+    call_command("image_report", stdout=out)
+    assert "Обработано изображений: 1" in out.getvalue()
+
+
+def test_equal_uploads_share_one_file(
+    user_client, published_category, django_capture_on_commit_callbacks
+):
+    first = create_post_with_image(user_client, published_category)
+    first.title = "Первая"
+    first.save()
+    second = create_post_with_image(user_client, published_category)
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые изображения хранятся в одном файле."
+    )
+    storage = first.image.storage
+    assert MediaFile.objects.get(name=first.image.name).refcount == 2
+
+    user_client.post(f"/posts/{first.id}/delete/")
+    assert storage.exists(second.image.name), (
+        "Убедитесь, что файл не удаляется, пока на него ссылаются"
+        " другие публикации."
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post(f"/posts/{second.id}/delete/")
+    assert not storage.exists(second.image.name), (
+        "Убедитесь, что файл удаляется вместе с последней публикацией,"
+        " которая на него ссылается."
+    )
+
+
+def post_upload(user_client, published_category, upload):
+    return user_client.post(
+        "/posts/create/",
+        {
+            "title": "Загрузка",
+            "text": "Текст",
+            "pub_date": "2020-01-01 10:00",
+            "category": published_category.id,
+            "image": upload,
+        },
+    )
+
+
+def test_upload_rejects_non_image(user_client, published_category):
+    upload = SimpleUploadedFile("photo.jpg", b"not an image" * 100)
+    response = post_upload(user_client, published_category, upload)
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что загрузка файла, не являющегося изображением,"
+        " прерывается с ошибкой формы."
+    )
+    assert not Post.objects.filter(title="Загрузка").exists()
+
+
+@override_settings(BLOG_IMAGE_UPLOAD_MAX_SIZE=1024)
+def test_upload_rejects_oversized_image(user_client, published_category):
+    response = post_upload(user_client, published_category, make_upload())
+    image_errors = str(response.context["form"].errors.get("image"))
+    assert "Размер файла" in image_errors, (
+        "Убедитесь, что загрузка файла больше допустимого размера"
+        " прерывается с ошибкой формы."
+    )
+    assert not Post.objects.filter(title="Загрузка").exists()
+
+
+def test_upload_keeps_csrf_check(user, published_category):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    response = post_upload(client, published_category, make_upload())
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+@override_settings(BLOG_IMAGE_UPLOAD_MAX_SIZE=1024)
+def test_rejected_upload_keeps_fields_after_file(user, published_category):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    client.get("/posts/create/")
+    response = client.post(
+        "/posts/create/",
+        {
+            "title": "Загрузка",
+            "image": make_upload(),
+            "text": "Текст",
+            "pub_date": "2020-01-01 10:00",
+            "category": published_category.id,
+            "csrfmiddlewaretoken": client.cookies["csrftoken"].value,
+        },
+    )
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что поля формы после отклонённого файла, включая"
+        " CSRF-токен, дочитываются из запроса."
+    )
+    assert "image" in response.context["form"].errors
+    assert not Post.objects.filter(title="Загрузка").exists()
+
+
+def test_image_dimensions_are_stored(user_client, uploaded_post):
+    post = uploaded_post
+    assert (post.image_width, post.image_height) == (2048, 1365), (
+        "Убедитесь, что размеры изображения сохраняются в публикации."
+    )
+    content = user_client.get("/").content.decode()
+    assert 'width="640" height="427"' in content, (
+        "Убедитесь, что изображения в ленте выводятся с размерами."
+    )
+    assert 'loading="lazy"' in content and 'decoding="async"' in content, (
+        "Убедитесь, что изображения в ленте загружаются лениво."
+    )
+
+
+def test_backfill_image_dimensions(post_with_published_location):
+    post = post_with_published_location
+    call_command("backfill_image_dimensions", stdout=StringIO())
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (100, 100), (
+        "Убедитесь, что команда `backfill_image_dimensions` заполняет"
+        " размеры изображений."
+    )
+
+
+def test_post_without_dimensions_keeps_loading(client, uploaded_post):
+    Post.objects.filter(pk=uploaded_post.pk).update(
+        image="post_images/missing.jpg",
+        image_width=None,
+        image_height=None,
+        image_meta={},
+    )
+    response = client.get(f"/posts/{uploaded_post.id}/")
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что публикация без сохранённых размеров фото"
+        " открывается, даже если файла изображения нет."
+    )
+
+
+def test_admin_image_change_is_processed(admin_client, uploaded_post):
+    post = uploaded_post
+    old_image = post.image.name
+    response = admin_client.post(
+        f"/admin/blog/post/{post.id}/change/",
+        {
+            "title": post.title,
+            "text": post.text,
+            "pub_date_0": "2020-01-01",
+            "pub_date_1": "10:00:00",
+            "author": post.author_id,
+            "category": post.category_id,
+            "is_published": "on",
+            "image": make_upload(size=(1000, 800), name="other.jpg"),
+        },
+    )
+    assert response.status_code == 302
+    post.refresh_from_db()
+    assert ImageJob.objects.filter(post=post).exists(), (
+        "Убедитесь, что изображение, заменённое в админке, ставится"
+        " в очередь на обработку."
+    )
+    assert post.image_meta == {"pending": True}
+    assert not MediaFile.objects.filter(name=old_image).exists(), (
+        "Убедитесь, что при замене изображения в админке освобождаются"
+        " ссылки на старые файлы."
+    )
+    call_command("process_images", workers=0)
+    post.refresh_from_db()
+    assert post.image_meta["renditions"]["card"]["width"] == 640
+    assert (post.image_width, post.image_height) == (1000, 800)
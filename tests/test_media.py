@@ -0,0 +1,138 @@
+import os
+import time
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import Resolver404, resolve
+
+from blog.media import serve_media
+
+pytestmark = [pytest.mark.django_db]
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_name():
+    name = default_storage.save("post_images/range.png", ContentFile(CONTENT))
+    yield name
+    default_storage.delete(name)
+
+
+def test_media_is_served_with_validators(client, media_name):
+    response = client.get(default_storage.url(media_name))
+    assert response.status_code == HTTPStatus.OK
+    assert b"".join(response.streaming_content) == CONTENT
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хешем в имени отдаются"
+        " с `Cache-Control: immutable`."
+    )
+    assert response["Accept-Ranges"] == "bytes"
+    response = client.get(
+        default_storage.url(media_name), HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что при совпадении ETag возвращается ответ 304."
+    )
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=10-19", CONTENT[10:20]),
+        ("bytes=1000-", CONTENT[1000:]),
+        ("bytes=-4", CONTENT[-4:]),
+    ],
+)
+def test_media_range_requests(client, media_name, header, expected):
+    response = client.get(default_storage.url(media_name), HTTP_RANGE=header)
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT, (
+        "Убедитесь, что медиафайлы поддерживают запросы с заголовком"
+        " `Range`."
+    )
+    assert b"".join(response.streaming_content) == expected
+    assert int(response["Content-Length"]) == len(expected)
+
+
+def test_media_unsatisfiable_range(client, media_name):
+    response = client.get(
+        default_storage.url(media_name), HTTP_RANGE="bytes=5000-"
+    )
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+
+@pytest.mark.parametrize(
+    "mode, header, value",
+    [
+        ("x-accel-redirect", "X-Accel-Redirect", "/protected-media/{name}"),
+        ("x-sendfile", "X-Sendfile", "{root}/{name}"),
+    ],
+)
+def test_media_offload_to_front_server(
+    client, settings, media_name, mode, header, value
+):
+    with override_settings(BLOG_MEDIA_SERVING=mode):
+        response = client.get(default_storage.url(media_name))
+    assert response[header] == value.format(
+        name=media_name, root=settings.MEDIA_ROOT
+    ), f"Убедитесь, что в режиме `{mode}` передача отдаётся фронт-серверу."
+    assert not response.content
+
+
+def test_media_path_traversal(client):
+    response = client.get("/media/..%2Fmanage.py")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_gc_media_removes_only_old_orphans(
+    settings, tmp_path, post_of_another_author
+):
+    post = post_of_another_author
+    settings.MEDIA_ROOT = tmp_path
+    referenced = default_storage.save(
+        "post_images/kept.jpg", ContentFile(b"kept")
+    )
+    orphan = default_storage.save(
+        "post_images/orphan.jpg", ContentFile(b"orphan")
+    )
+    fresh = default_storage.save(
+        "post_images/fresh.jpg", ContentFile(b"fresh")
+    )
+    post.image = referenced
+    post.save()
+    old = time.time() - 48 * 60 * 60
+    for name in (referenced, orphan):
+        os.utime(default_storage.path(name), (old, old))
+
+    call_command("gc_media", dry_run=True, stdout=StringIO())
+    assert default_storage.exists(orphan), (
+        "Убедитесь, что в режиме `--dry-run` файлы не удаляются."
+    )
+    call_command("gc_media", stdout=StringIO())
+    assert not default_storage.exists(orphan), (
+        "Убедитесь, что `gc_media` удаляет файлы, на которые не ссылается"
+        " ни одна публикация."
+    )
+    assert default_storage.exists(referenced) and default_storage.exists(
+        fresh
+    ), (
+        "Убедитесь, что `gc_media` не трогает используемые файлы и файлы"
+        " моложе периода ожидания."
+    )
+
+
+def test_media_route_does_not_catch_other_urls(client):
+    for url in ("/posts/1", "/auth/login", "/no-such-page/"):
+        with pytest.raises(Resolver404):
+            resolve(url)
+    assert resolve("/media/post_images/a.png").func is serve_media
+    response = client.get("/auth/login")
+    assert response.status_code == HTTPStatus.MOVED_PERMANENTLY, (
+        "Убедитесь, что адреса без завершающего слеша перенаправляются."
+    )
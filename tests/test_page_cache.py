@@ -0,0 +1,204 @@
+import pytest
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from mixer.backend.django import Mixer
+
+from blog.templatetags.post_cards import card_key
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def cached_post(mixer: Mixer, user, published_category, published_location):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+
+
+def page_urls(post):
+    return (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    )
+
+
+def get_uncached(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        content = client.get(url).content.decode()
+    return bool(queries), content
+
+
+def test_anonymous_pages_are_cached(client, user_client, cached_post):
+    for url in page_urls(cached_post):
+        assert get_uncached(client, url)[0]
+        assert not get_uncached(client, url)[0], (
+            f"Убедитесь, что страница `{url}` для анонимного пользователя"
+            " отдаётся из кеша."
+        )
+        assert get_uncached(user_client, url)[0], (
+            "Убедитесь, что страницы авторизованных пользователей"
+            " не кешируются."
+        )
+
+
+@pytest.mark.parametrize(
+    "change",
+    ["post", "comment", "category", "location"],
+)
+def test_cached_pages_are_invalidated(client, mixer, cached_post, change):
+    for url in page_urls(cached_post):
+        client.get(url)
+    if change == "post":
+        cached_post.title = marker = "Новый заголовок"
+        cached_post.save()
+    elif change == "comment":
+        mixer.blend("blog.Comment", post=cached_post, text="Свежий отзыв")
+        marker = "Свежий отзыв"
+    elif change == "category":
+        cached_post.category.title = marker = "Новая категория"
+        cached_post.category.save()
+    else:
+        cached_post.location.name = marker = "Новое место"
+        cached_post.location.save()
+
+    for url in page_urls(cached_post):
+        is_uncached, content = get_uncached(client, url)
+        expected = marker
+        if change == "comment" and not url.startswith("/posts/"):
+            expected = "Комментарии (1)"
+        assert is_uncached and expected in content, (
+            f"Убедитесь, что кеш страницы `{url}` сбрасывается"
+            f" при изменении объекта `{change}`."
+        )
+
+
+def test_post_cards_are_cached(user_client, cached_post):
+    user_client.get("/")
+    assert cache.get(card_key(cached_post)), (
+        "Убедитесь, что карточка публикации сохраняется в кеше."
+    )
+    cached_post.title = "Новый заголовок"
+    cached_post.save()
+    assert "Новый заголовок" in user_client.get("/").content.decode(), (
+        "Убедитесь, что карточка публикации перерисовывается"
+        " после изменения публикации."
+    )
+
+
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_unchanged_pages_are_not_modified(
+    request, mixer, client_name, cached_post
+):
+    page_client = request.getfixturevalue(client_name)
+    etags = {}
+    for url in page_urls(cached_post):
+        response = page_client.get(url)
+        assert response.has_header("ETag"), (
+            f"Убедитесь, что страница `{url}` отдаётся с заголовком `ETag`."
+        )
+        etags[url] = response["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = page_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 304, (
+            f"Убедитесь, что неизменившаяся страница `{url}` отдаётся"
+            " с кодом 304."
+        )
+        # session and user for signed in users, then the validator
+        assert len(queries) <= (3 if client_name == "user_client" else 1)
+
+    mixer.blend("blog.Comment", post=cached_post)
+    for url, etag in etags.items():
+        response = page_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f"Убедитесь, что после нового комментария страница `{url}`"
+            " отдаётся заново."
+        )
+
+
+def test_edited_comment_changes_detail_etag(client, mixer, cached_post):
+    comment = mixer.blend("blog.Comment", post=cached_post)
+    url = f"/posts/{cached_post.id}/"
+    etag = client.get(url)["ETag"]
+    comment.text = "Исправленный комментарий"
+    comment.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "Исправленный комментарий" in response.content.decode()
+
+
+def test_deleted_post_changes_feed_etag(client, mixer, cached_post):
+    older_post = mixer.blend(
+        "blog.Post",
+        author=cached_post.author,
+        category=cached_post.category,
+    )
+    etags = {url: client.get(url)["ETag"] for url in page_urls(cached_post)}
+    older_post.delete()
+    for url in page_urls(cached_post)[:3]:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f"Убедитесь, что после удаления публикации страница `{url}`"
+            " отдаётся заново."
+        )
+
+
+def test_renamed_author_pages_are_invalidated(
+    client, mixer, user, cached_post
+):
+    other_post = mixer.blend(
+        "blog.Post", category=cached_post.category, location=None
+    )
+    mixer.blend("blog.Comment", post=other_post, author=user)
+    urls = (f"/posts/{cached_post.id}/", f"/posts/{other_post.id}/")
+    for url in urls:
+        client.get(url)
+    user.username = "renamed_author"
+    user.save()
+    for url in urls:
+        is_uncached, content = get_uncached(client, url)
+        assert is_uncached and "@renamed_author" in content, (
+            f"Убедитесь, что кеш страницы `{url}` сбрасывается"
+            " при смене имени пользователя."
+        )
+
+
+def test_post_cards_follow_author_rename(user_client, user, cached_post):
+    user_client.get("/")
+    user.username = "renamed_author"
+    user.save()
+    for url in page_urls(cached_post)[:2]:
+        assert "@renamed_author" in user_client.get(url).content.decode(), (
+            f"Убедитесь, что карточки на странице `{url}` перерисовываются"
+            " после смены имени автора."
+        )
+
+
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_profile_changes_profile_etag(request, user, client_name):
+    page_client = request.getfixturevalue(client_name)
+    url = f"/profile/{user.username}/"
+    etag = page_client.get(url)["ETag"]
+    user.first_name = "Новое имя"
+    user.save()
+    response = page_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200 and (
+        "Новое имя" in response.content.decode()
+    ), (
+        "Убедитесь, что после изменения профиля его страница"
+        " отдаётся заново."
+    )
+
+
+def test_deleted_user_profile_is_invalidated(client, another_user):
+    url = f"/profile/{another_user.username}/"
+    assert client.get(url).status_code == 200
+    another_user.delete()
+    assert client.get(url).status_code == 404, (
+        "Убедитесь, что кеш профиля сбрасывается при удалении пользователя."
+    )
@@ -0,0 +1,142 @@
+import re
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import constants
+from blog.paginators import encode_cursor
+from blog.views import PostListView
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+N_POSTS = N_PER_PAGE * 2 + 5
+
+
+@pytest.fixture
+def many_posts(mixer: Mixer, user, published_category):
+    # Pairs of posts share pub_date to check the id tie-breaker.
+    pub_dates = (
+        timezone.now() - timedelta(days=1 + i // 2) for i in range(N_POSTS)
+    )
+    return mixer.cycle(N_POSTS).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=pub_dates,
+    )
+
+
+def _walk(client, url, direction):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append([post.id for post in response.context["page_obj"]])
+        token = re.search(
+            rf'href="\?{direction}=([\w-]+)"', response.content.decode()
+        )
+        url = token and f"/?{direction}={token.group(1)}"
+    return pages
+
+
+def test_cursor_pagination(settings, client, many_posts):
+    settings.BLOG_PAGINATION_MODE = "cursor"
+    expected = sorted(
+        many_posts, key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+    expected_ids = [post.id for post in expected]
+
+    forward = _walk(client, "/", "after")
+    assert [post_id for page in forward for post_id in page] == (
+        expected_ids
+    ), "Убедитесь, что курсорная пагинация обходит ленту без пропусков."
+    assert [len(page) for page in forward] == [N_PER_PAGE, N_PER_PAGE, 5]
+
+    last_page = client.get("/", {"after": encode_cursor(expected[-6])})
+    before = re.search(
+        r'href="\?before=([\w-]+)"', last_page.content.decode()
+    )
+    backward = _walk(client, f"/?before={before.group(1)}", "before")
+    assert backward == forward[-2::-1], (
+        "Убедитесь, что ссылка на предыдущую страницу ведёт назад по ленте."
+    )
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        urlsafe_b64encode(b"2020-01-01T00:00:00|99999999999999999999999"),
+        urlsafe_b64encode(b"2020-01-01T00:00:00|-1"),
+    ],
+    ids=["garbage", "pk_overflow", "negative_pk"],
+)
+def test_invalid_cursor_returns_404(client, many_posts, cursor):
+    if isinstance(cursor, bytes):
+        cursor = cursor.decode().rstrip("=")
+    response = client.get("/", {"after": cursor})
+    assert response.status_code == 404, (
+        "Убедитесь, что некорректный курсор страницы приводит к ответу 404."
+    )
+
+
+def test_page_links_are_windowed(client, many_posts, monkeypatch):
+    monkeypatch.setattr(PostListView, "paginate_by", 1)
+    response = client.get("/", {"page": N_POSTS // 2})
+    page_links = re.findall(
+        r'class="page-link"[^>]*>\s*(\d+)\s*<', response.content.decode()
+    )
+    max_links = (
+        2 * constants.PAGINATOR_ON_EACH_SIDE
+        + 2 * constants.PAGINATOR_ON_ENDS
+        + 1
+    )
+    assert len(page_links) == max_links, (
+        "Убедитесь, что пагинатор выводит ограниченное окно ссылок"
+        " на страницы, а не все страницы ленты."
+    )
+
+
+def test_feed_count_is_cached(client, mixer: Mixer, many_posts):
+    def count_queries():
+        with CaptureQueriesContext(connection) as queries:
+            client.get("/")
+        return [q for q in queries if "COUNT(" in q["sql"]]
+
+    assert count_queries()
+    assert not count_queries(), (
+        "Убедитесь, что количество публикаций ленты берётся из кеша."
+    )
+    post = many_posts[0]
+    mixer.blend(
+        "blog.Post", author=post.author, category=post.category
+    )
+    assert count_queries(), (
+        "Убедитесь, что кеш количества публикаций сбрасывается"
+        " при создании публикации."
+    )
+
+
+@pytest.mark.parametrize("change", ["unpublish", "delete"])
+def test_profile_count_follows_category(
+    another_user_client, user, published_category, many_posts, change
+):
+    url = f"/profile/{user.username}/"
+    paginator = another_user_client.get(url).context["paginator"]
+    assert paginator.count == N_POSTS
+    if change == "unpublish":
+        published_category.is_published = False
+        published_category.save()
+    else:
+        published_category.delete()
+    paginator = another_user_client.get(url).context["paginator"]
+    assert paginator.count == 0, (
+        "Убедитесь, что кеш количества публикаций в профиле сбрасывается"
+        " при снятии категории с публикации и её удалении."
+    )
@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def own_comment(mixer: Mixer, user, post_with_published_location):
+    return mixer.blend(
+        "blog.Comment", author=user, post=post_with_published_location
+    )
+
+
+@pytest.mark.parametrize(
+    "method, url, data, expected_status, num_queries",
+    [
+        # session, user, post, location and category choices
+        ("get", "/posts/{post}/edit/", None, HTTPStatus.OK, 5),
+        # session, user, post, category choice, FK check, UPDATE
+        (
+            "post",
+            "/posts/{post}/edit/",
+            {
+                "title": "Заголовок",
+                "text": "Текст",
+                "pub_date": "2020-01-01 10:00",
+                "category": "{category}",
+            },
+            HTTPStatus.FOUND,
+            6,
+        ),
+        # session, user, post with category and location
+        ("get", "/posts/{post}/delete/", None, HTTPStatus.OK, 3),
+        # session, user, post, comments, 3 DELETEs, comment counter UPDATE,
+        # image reference UPDATE
+        ("post", "/posts/{post}/delete/", None, HTTPStatus.FOUND, 9),
+        # session, user, comment
+        (
+            "get",
+            "/posts/{post}/edit_comment/{comment}/",
+            None,
+            HTTPStatus.OK,
+            3,
+        ),
+        # session, user, comment, UPDATE
+        (
+            "post",
+            "/posts/{post}/edit_comment/{comment}/",
+            {"text": "Комментарий"},
+            HTTPStatus.FOUND,
+            4,
+        ),
+        (
+            "get",
+            "/posts/{post}/delete_comment/{comment}/",
+            None,
+            HTTPStatus.OK,
+            3,
+        ),
+        # session, user, comment, DELETE, comment counter UPDATE
+        (
+            "post",
+            "/posts/{post}/delete_comment/{comment}/",
+            None,
+            HTTPStatus.FOUND,
+            5,
+        ),
+    ],
+    ids=[
+        "edit_post_get",
+        "edit_post_post",
+        "delete_post_get",
+        "delete_post_post",
+        "edit_comment_get",
+        "edit_comment_post",
+        "delete_comment_get",
+        "delete_comment_post",
+    ],
+)
+def test_author_only_views_num_queries(
+    method,
+    url,
+    data,
+    expected_status,
+    num_queries,
+    user_client,
+    own_comment,
+    django_assert_num_queries,
+):
+    post = own_comment.post
+    ids = {"post": post.id, "comment": own_comment.id,
+           "category": post.category_id}
+    url = url.format(**ids)
+    data = data and {key: str(value).format(**ids)
+                     for key, value in data.items()}
+    with django_assert_num_queries(num_queries):
+        response = getattr(user_client, method)(url, data)
+    assert response.status_code == expected_status
@@ -0,0 +1,77 @@
+from typing import List
+
+import pytest
+from django.db import connection
+from django.db.models import OuterRef, QuerySet, Subquery
+
+from blog.models import Category, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def is_bad_plan_step(step: str) -> bool:
+    full_scan = step.startswith("SCAN") and "INDEX" not in step
+    return full_scan or "TEMP B-TREE" in step
+
+
+def get_query_plan(queryset: QuerySet) -> List[str]:
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="План запроса проверяется для SQLite"
+)
+@pytest.mark.parametrize(
+    "get_queryset",
+    [
+        lambda user, category: Post.objects.published(),
+        lambda user, category: Post.objects.published().filter(
+            category=category
+        ),
+        lambda user, category: Post.objects.filter(author=user),
+        lambda user, category: Post.objects.published().filter(author=user),
+    ],
+    ids=["index", "category", "profile_owner", "profile"],
+)
+def test_feed_uses_index(get_queryset, user, published_category):
+    queryset = (
+        get_queryset(user, published_category)
+        .with_related_fields()
+        .order_by("-pub_date")
+    )
+    plan = get_query_plan(queryset[:10])
+    bad_steps = [step for step in plan if is_bad_plan_step(step)]
+    assert not bad_steps, (
+        "Убедитесь, что запрос ленты публикаций использует индекс и не"
+        f" сортирует таблицу целиком. План запроса: {plan}"
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="План запроса проверяется для SQLite"
+)
+@pytest.mark.parametrize(
+    "get_queryset",
+    [
+        lambda: Post.objects.published().last_update(),
+        lambda: Category.objects.annotate(
+            last_update=Subquery(
+                Post.objects.published()
+                .filter(category=OuterRef("pk"))
+                .last_update()
+            )
+        ).filter(slug="news"),
+        lambda: Post.objects.filter(author_id=1).last_update(),
+    ],
+    ids=["index", "category", "profile"],
+)
+def test_feed_last_update_uses_index(get_queryset):
+    plan = get_query_plan(get_queryset())
+    bad_steps = [step for step in plan if is_bad_plan_step(step)]
+    assert not bad_steps, (
+        "Убедитесь, что время последнего изменения ленты вычисляется"
+        f" по индексу. План запроса: {plan}"
+    )
@@ -0,0 +1,189 @@
+import asyncio
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+from blog.static_server import StaticFilesASGI, StaticFilesWSGI, StaticIndex
+
+
+@pytest.fixture
+def collected_static(tmp_path):
+    with override_settings(
+        STATIC_ROOT=tmp_path,
+        STATICFILES_STORAGE=(
+            "blog.staticfiles.CompressedManifestStaticFilesStorage"
+        ),
+    ):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        yield tmp_path
+
+
+def test_collectstatic_writes_hashed_compressed_files(collected_static):
+    manifest = json.loads(
+        (collected_static / "staticfiles.json").read_text()
+    )
+    hashed_css = manifest["paths"]["css/bootstrap.min.css"]
+    assert hashed_css != "css/bootstrap.min.css", (
+        "Убедитесь, что статика собирается с хешем в имени файла."
+    )
+    assert (collected_static / f"{hashed_css}.gz").exists(), (
+        "Убедитесь, что при сборке статики рядом с файлами создаются"
+        " сжатые копии."
+    )
+
+
+@pytest.mark.django_db
+def test_base_template_uses_local_hashed_css(client, collected_static):
+    content = client.get("/").content.decode()
+    assert "cdn.jsdelivr.net" not in content, (
+        "Убедитесь, что Bootstrap подключается из локальной статики,"
+        " а не с CDN."
+    )
+    manifest = json.loads(
+        (collected_static / "staticfiles.json").read_text()
+    )
+    assert manifest["paths"]["css/bootstrap.pruned.min.css"] in content
+
+
+def test_prune_css(tmp_path):
+    output = tmp_path / "pruned.css"
+    critical = tmp_path / "critical.html"
+    out = StringIO()
+    call_command(
+        "prune_css", output=str(output), critical=str(critical), stdout=out
+    )
+    css = output.read_text()
+    assert ".card{" in css and ".pagination{" in css, (
+        "Убедитесь, что в урезанной таблице стилей остаются классы,"
+        " используемые в шаблонах."
+    )
+    assert ".carousel" not in css, (
+        "Убедитесь, что из таблицы стилей удаляются неиспользуемые классы."
+    )
+    assert css.startswith('@charset "UTF-8";/*!')
+    assert critical.read_text().startswith("<style>")
+    assert "экономия" in out.getvalue()
+
+
+@pytest.fixture
+def static_app(collected_static):
+    def django_app(environ, start_response):
+        start_response("200 OK", [])
+        return [b"django"]
+
+    return StaticFilesWSGI(
+        django_app, StaticIndex(root=collected_static, prefix="/static/")
+    )
+
+
+def call_wsgi(app, path, method="GET", **headers):
+    environ = {"PATH_INFO": path, "REQUEST_METHOD": method, **headers}
+    response = {}
+
+    def start_response(status, response_headers):
+        response["status"] = status
+        response["headers"] = dict(response_headers)
+
+    response["body"] = b"".join(app(environ, start_response))
+    return response
+
+
+def test_static_server_serves_hashed_files(static_app, collected_static):
+    manifest = json.loads(
+        (collected_static / "staticfiles.json").read_text()
+    )
+    hashed_css = manifest["paths"]["css/bootstrap.pruned.min.css"]
+    response = call_wsgi(static_app, f"/static/{hashed_css}")
+    assert response["status"] == "200 OK"
+    assert response["body"] == (collected_static / hashed_css).read_bytes()
+    assert "immutable" in response["headers"]["Cache-Control"], (
+        "Убедитесь, что файлы с хешем в имени отдаются с заголовком"
+        " `Cache-Control: immutable`."
+    )
+
+    gzipped = call_wsgi(
+        static_app,
+        f"/static/{hashed_css}",
+        HTTP_ACCEPT_ENCODING="gzip, br;q=0",
+    )
+    assert gzipped["headers"]["Content-Encoding"] == "gzip", (
+        "Убедитесь, что клиенту, поддерживающему gzip, отдаётся"
+        " заранее сжатая копия файла."
+    )
+    assert gzipped["body"] == (
+        collected_static / f"{hashed_css}.gz"
+    ).read_bytes()
+    assert gzipped["headers"]["ETag"] != response["headers"]["ETag"]
+
+    not_modified = call_wsgi(
+        static_app,
+        f"/static/{hashed_css}",
+        HTTP_IF_NONE_MATCH=response["headers"]["ETag"],
+    )
+    assert not_modified["status"] == "304 Not Modified"
+    assert not_modified["body"] == b""
+    etag = response["headers"]["ETag"]
+    for if_none_match in (f'"other",{etag}', f"W/{etag}"):
+        not_modified = call_wsgi(
+            static_app,
+            f"/static/{hashed_css}",
+            HTTP_IF_NONE_MATCH=if_none_match,
+        )
+        assert not_modified["status"] == "304 Not Modified", (
+            "Убедитесь, что заголовок `If-None-Match` разбирается"
+            " по правилам HTTP."
+        )
+
+    head = call_wsgi(static_app, f"/static/{hashed_css}", method="HEAD")
+    assert head["body"] == b""
+    assert head["headers"]["Content-Length"] == response["headers"][
+        "Content-Length"
+    ]
+
+
+def test_static_server_passes_other_requests(static_app):
+    for path in ("/", "/static/css/missing.css", "/static/css/x.css.gz"):
+        assert call_wsgi(static_app, path)["body"] == b"django", (
+            "Убедитесь, что запросы вне индекса статики передаются Django."
+        )
+
+
+def test_static_paths_are_not_decoded_twice(tmp_path):
+    (tmp_path / "aA.css").write_text("decoded")
+    (tmp_path / "a%41.css").write_text("literal")
+    index = StaticIndex(root=tmp_path, prefix="/static/")
+    assert index.lookup("/static/a%41.css").path == str(
+        tmp_path / "a%41.css"
+    )
+    assert index.lookup("/static/a%2541.css") is None, (
+        "Убедитесь, что уже декодированный путь запроса"
+        " не декодируется повторно."
+    )
+
+
+def test_static_server_asgi(collected_static):
+    async def django_app(scope, receive, send):
+        raise AssertionError("Запрос к статике не должен доходить до Django.")
+
+    app = StaticFilesASGI(
+        django_app, StaticIndex(root=collected_static, prefix="/static/")
+    )
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/static/img/placeholder.svg",
+        "headers": [],
+    }
+    asyncio.run(app(scope, None, send))
+    assert messages[0]["status"] == 200
+    assert b"".join(message.get("body", b"") for message in messages[1:]) == (
+        collected_static / "img" / "placeholder.svg"
+    ).read_bytes()
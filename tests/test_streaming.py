@@ -0,0 +1,55 @@
+import pytest
+from django.core.cache import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def stream_feeds(settings):
+    settings.BLOG_STREAM_FEEDS = True
+
+
+def feed_urls(post):
+    return (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+
+
+def test_feeds_are_streamed(
+    user_client, many_posts_with_published_locations, stream_feeds
+):
+    post = many_posts_with_published_locations[0]
+    for url in feed_urls(post):
+        response = user_client.get(url)
+        assert response.streaming, (
+            f"Убедитесь, что в потоковом режиме страница `{url}`"
+            " отдаётся через `StreamingHttpResponse`."
+        )
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        assert "<header>" in chunks[0] and "<article" in chunks[0]
+        assert "card:" not in "".join(chunks)
+        cards = [chunk for chunk in chunks[1:] if 'class="card' in chunk]
+        assert len(cards) == len(chunks) - 1 > 1, (
+            "Убедитесь, что шапка страницы отправляется до карточек,"
+            " а карточки отправляются по одной."
+        )
+
+
+def test_streamed_page_matches_rendered_page(
+    client, settings, many_posts_with_published_locations
+):
+    post = many_posts_with_published_locations[0]
+    for url in feed_urls(post):
+        settings.BLOG_STREAM_FEEDS = True
+        streamed = b"".join(client.get(url).streaming_content)
+        cached = client.get(url)
+        assert not cached.streaming and cached.content == streamed, (
+            "Убедитесь, что потоковая страница сохраняется в кеш страниц."
+        )
+        cache.clear()
+        settings.BLOG_STREAM_FEEDS = False
+        assert client.get(url).content == streamed, (
+            "Убедитесь, что потоковая страница совпадает с обычной."
+        )
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def visible_ids():
+    return set(Post.objects.published().values_list("id", flat=True))
+
+
+def test_category_publication_toggles_posts(mixer: Mixer, user,
+                                            published_category):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    assert visible_ids() == {post.id for post in posts}
+
+    published_category.is_published = False
+    published_category.save()
+    assert not visible_ids(), (
+        "Убедитесь, что публикации скрываются из лент при снятии"
+        " категории с публикации."
+    )
+
+    published_category.is_published = True
+    published_category.save()
+    assert visible_ids() == {post.id for post in posts}
+
+
+def test_publish_scheduled_activates_due_posts(mixer: Mixer, user,
+                                               published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    assert not visible_ids()
+
+    call_command("publish_scheduled")
+    assert not visible_ids()
+
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    call_command("publish_scheduled")
+    assert visible_ids() == {post.id}, (
+        "Убедитесь, что отложенная публикация появляется в лентах,"
+        " когда наступает время её публикации."
+    )
+
+
+def test_hidden_posts_are_shown_to_author_only(
+    mixer: Mixer, user, user_client, another_user_client, client,
+    published_category
+):
+    hidden_post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=False,
+    )
+    profile_url = f"/profile/{user.username}/"
+    detail_url = f"/posts/{hidden_post.id}/"
+
+    assert hidden_post in user_client.get(profile_url).context["page_obj"]
+    assert user_client.get(detail_url).status_code == 200
+    for reader in (another_user_client, client):
+        assert hidden_post not in reader.get(profile_url).context["page_obj"]
+        assert reader.get(detail_url).status_code == 404
@@ -0,0 +1,16 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import engines
+
+
+def test_warm_templates_fills_cached_loader():
+    out = StringIO()
+    call_command("warm_templates", stdout=out)
+    loader = engines["django"].engine.template_loaders[0]
+    cached = getattr(loader, "get_template_cache", {})
+    for name in ("base.html", "includes/post_card.html", "blog/index.html"):
+        assert name in cached, (
+            f"Убедитесь, что команда `warm_templates` компилирует `{name}`."
+        )
+    assert "Скомпилировано шаблонов" in out.getvalue()